@@ -1,5 +1,19 @@
 """OLAP Export Tool package."""
+from typing import TYPE_CHECKING
+
 from .core.runner import main
-from .sinks import AnalyticsSink, sanitize_df, ClickHouseSink, DuckDBSink, PostgreSQLSink
+
+if TYPE_CHECKING:
+    from .sinks import AnalyticsSink, sanitize_df, ClickHouseSink, DuckDBSink, PostgreSQLSink
 
 __all__ = ["main", "AnalyticsSink", "sanitize_df", "ClickHouseSink", "DuckDBSink", "PostgreSQLSink"]
+
+_SINK_EXPORTS = frozenset(("AnalyticsSink", "sanitize_df", "ClickHouseSink", "DuckDBSink", "PostgreSQLSink"))
+
+
+def __getattr__(name):
+    # sinks тягнуть pandas — імпортуються при першому зверненні, а не при старті CLI
+    if name in _SINK_EXPORTS:
+        from . import sinks
+        return getattr(sinks, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
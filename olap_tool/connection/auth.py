@@ -1,19 +1,44 @@
 from pathlib import Path
 
 from .security import (
+    CredentialsCipher,
+    SALT_SIZE,
     get_machine_id,
-    generate_encryption_key,
+    get_legacy_machine_id,
     get_master_password,
     secure_credentials_file,
-    encrypt_credentials,
-    decrypt_credentials,
 )
-from ..core.utils import print_info, print_error
+from ..core.utils import print_info, print_error, init_colorama
 
 
 auth_username: str | None = None
 
 
+def _write_encrypted_credentials(cred_path: Path, username: str, password: str, base_secret: str) -> None:
+    cipher = CredentialsCipher(base_secret)
+    encrypted_data = cipher.encrypt(username, password)
+    with open(cred_path, "wb") as f:
+        f.write(cipher.salt)
+        f.write(b"\n")
+        f.write(encrypted_data)
+
+
+def _decrypt_with_machine_ids(encrypted_data: bytes, salt: bytes, master_password: str | None):
+    """
+    Розшифровує поточним ідентифікатором пристрою, потім попереднім (md5).
+
+    Returns:
+        (username, password, legacy) — legacy=True, якщо спрацював лише старий ідентифікатор
+    """
+    for machine_id, legacy in ((get_machine_id(), False), (get_legacy_machine_id(), True)):
+        base_secret = f"{machine_id}:{master_password}" if master_password else machine_id
+        cipher = CredentialsCipher(base_secret, salt)
+        username, password = cipher.decrypt(encrypted_data, quiet=True)
+        if username and password:
+            return username, password, legacy
+    return None, None, False
+
+
 def save_credentials(
     username: str,
     password: str,
@@ -29,12 +54,7 @@ def save_credentials(
             base_secret = (
                 f"{machine_id}:{master_password}" if master_password else machine_id
             )
-            key, salt = generate_encryption_key(base_secret)
-            encrypted_data = encrypt_credentials(username, password, key)
-            with open(cred_path, "wb") as f:
-                f.write(salt)
-                f.write(b"\n")
-                f.write(encrypted_data)
+            _write_encrypted_credentials(cred_path, username, password, base_secret)
         else:
             print_info(
                 "УВАГА: Облікові дані зберігаються без шифрування. "
@@ -70,40 +90,50 @@ def load_credentials(
     try:
         if encrypted:
             with open(cred_path, "rb") as f:
-                content = f.read().split(b"\n", 1)
-                if len(content) < 2:
+                content = f.read()
+                # Сіль — випадкові байти фіксованої довжини і сама може містити b"\n",
+                # тому відрізаємо її за довжиною, а не split() по першому переводу рядка
+                if content[SALT_SIZE:SALT_SIZE + 1] != b"\n":
                     print_error("Невірний формат файлу облікових даних (відсутній блок солі). Файл пошкоджено.")
                     return None, None
-                salt, encrypted_data = content
+                salt = content[:SALT_SIZE]
+                encrypted_data = content[SALT_SIZE + 1:]
                 if not salt or not encrypted_data:
                     print_error("Файл облікових даних пошкоджено (порожній сіль або дані). Буде видалено.")
                     return None, None
-                machine_id = get_machine_id()
                 mp = get_master_password(
                     use_master_password=use_master_password,
                     master_password=master_password,
                 )
-                base_secret = (
-                    f"{machine_id}:{mp}" if mp else machine_id
-                )
-                key, _ = generate_encryption_key(base_secret, salt)
-                username, password = decrypt_credentials(encrypted_data, key)
+                username, password, legacy = _decrypt_with_machine_ids(encrypted_data, salt, mp)
                 if not (username and password) and use_master_password and not master_password:
                     try:
                         import getpass
                         from colorama import Fore
 
+                        init_colorama()
                         mp_retry = getpass.getpass(
                                 f"{Fore.CYAN}Введіть майстер-пароль для розшифрування: {Fore.RESET}"
                             )
-                        base_secret_retry = f"{machine_id}:{mp_retry}" if mp_retry else machine_id
-                        key_retry, _ = generate_encryption_key(base_secret_retry, salt)
-                        username, password = decrypt_credentials(
-                            encrypted_data, key_retry
+                        mp = mp_retry or None
+                        username, password, legacy = _decrypt_with_machine_ids(
+                            encrypted_data, salt, mp
                         )
                     except Exception:
                         pass
                 if username and password:
+                    if legacy:
+                        # Файл зашифровано старим md5-ідентифікатором — перешифровуємо
+                        # поточним, щоб наступні запуски не робили дві спроби KDF
+                        try:
+                            machine_id = get_machine_id()
+                            _write_encrypted_credentials(
+                                cred_path, username, password,
+                                f"{machine_id}:{mp}" if mp else machine_id,
+                            )
+                            secure_credentials_file(cred_path)
+                        except Exception as e:
+                            print_error(f"Не вдалося оновити шифрування облікових даних: {e}")
                     auth_username = username
                     return username, password
                 # Не вдалося розшифрувати — даємо інформативну пораду
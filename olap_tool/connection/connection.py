@@ -332,6 +332,18 @@ def connect_using_oledb(connection_string, auth_details, OleDbConnection, OleDbC
         return None, None
 
 
+def ping_connection(connection) -> bool:
+    """Перевіряє, що відкрите з'єднання ще живе: тривіальний DAX без звернення до даних."""
+    try:
+        cursor = connection.cursor()
+        cursor.execute('EVALUATE ROW("x", 1)')
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
 def connect_to_olap(
     secrets: "SecretsConfig",
     adomd_dll_path: str = "",
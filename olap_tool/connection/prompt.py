@@ -2,10 +2,11 @@ import getpass
 from typing import Optional
 from colorama import Fore
 
-from ..core.utils import print_info
+from ..core.utils import print_info, init_colorama
 
 
 def prompt_credentials(with_domain: bool = False, domain: Optional[str] = None):
+    init_colorama()
     print_info("Введіть облікові дані для підключення до OLAP:")
     username = input(f"{Fore.CYAN}Ім'я користувача: {Fore.RESET}")
     password = getpass.getpass(f"{Fore.CYAN}Пароль: {Fore.RESET}")
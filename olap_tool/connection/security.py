@@ -1,36 +1,41 @@
 import base64
+import functools
+import hashlib
 import os
 from pathlib import Path
 from typing import Optional, Tuple
 
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from ..core.utils import print_info, print_warning, print_error, init_colorama
 
-from ..core.utils import print_info, print_warning, print_error
 
-
-def get_machine_id() -> str:
+@functools.lru_cache(maxsize=None)
+def _machine_id_source() -> str:
     """
-    Генерує стабільний ідентифікатор пристрою, що не змінюється залежно від
-    типу терміналу (Git Bash, CMD, PowerShell, планувальник).
+    Стабільний рядок пристрою, що не змінюється залежно від типу терміналу
+    (Git Bash, CMD, PowerShell, планувальник).
     Використовує platform.node() замість змінних середовища, які можуть
     відрізнятися або бути відсутніми в різних оточеннях.
+    Значення не змінюється за життя процесу, тож обчислюється один раз.
     """
     try:
-        import hashlib
         import platform
-        import getpass
 
         hostname = platform.node() or "unknown_host"
         username = _safe_getuser()
-        unique_id = f"{hostname.lower()}-{username.lower()}"
-        return hashlib.md5(unique_id.encode("utf-8")).hexdigest()
+        return f"{hostname.lower()}-{username.lower()}"
     except Exception as e:
         print_warning(f"Не вдалося отримати унікальний ідентифікатор пристрою: {e}")
-        import hashlib
-        fallback = f"user-{os.environ.get('USERNAME', 'unknown')}"
-        return hashlib.md5(fallback.encode("utf-8")).hexdigest()
+        return f"user-{os.environ.get('USERNAME', 'unknown')}"
+
+
+def get_machine_id() -> str:
+    """Ідентифікатор пристрою для ключа шифрування облікових даних (blake2b, 32 hex)."""
+    return hashlib.blake2b(_machine_id_source().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_legacy_machine_id() -> str:
+    """Попередній md5-ідентифікатор — лише для розшифрування старих файлів облікових даних."""
+    return hashlib.md5(_machine_id_source().encode("utf-8")).hexdigest()
 
 
 def _safe_getuser() -> str:
@@ -48,15 +53,35 @@ def _safe_getuser() -> str:
         )
 
 
+_KDF_ITERATIONS = 100000
+
+# (sha256(пароль), сіль) -> ключ Fernet. Повторні encrypt/decrypt у межах
+# процесу (daemon) не повторюють 100k ітерацій PBKDF2; сам пароль у кеші
+# не зберігається
+_derived_keys: dict = {}
+_DERIVED_KEYS_MAX = 4
+
+
+# Довжина солі; у файлі облікових даних сіль стоїть перед b"\n" і шифротекстом
+SALT_SIZE = 16
+
+
 def generate_encryption_key(
     password: str | bytes, salt: bytes | None = None
 ) -> Tuple[bytes, bytes]:
     if salt is None:
-        salt = os.urandom(16)
+        salt = os.urandom(SALT_SIZE)
     if isinstance(password, str):
         password = password.encode()
-    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
-    key = base64.urlsafe_b64encode(kdf.derive(password))
+    cache_key = (hashlib.sha256(password).digest(), salt)
+    key = _derived_keys.get(cache_key)
+    if key is None:
+        # hashlib.pbkdf2_hmac — реалізація OpenSSL; байти ті самі, що в PBKDF2HMAC
+        derived = hashlib.pbkdf2_hmac("sha256", password, salt, _KDF_ITERATIONS, dklen=32)
+        key = base64.urlsafe_b64encode(derived)
+        if len(_derived_keys) >= _DERIVED_KEYS_MAX:
+            _derived_keys.pop(next(iter(_derived_keys)))
+        _derived_keys[cache_key] = key
     return key, salt
 
 
@@ -75,6 +100,7 @@ def get_master_password(
         from colorama import Fore
 
         if sys.stdin and sys.stdin.isatty():
+            init_colorama()
             mp = getpass.getpass(
                 f"{Fore.CYAN}Введіть майстер-пароль для шифрування (залиште порожнім, щоб пропустити): {Fore.RESET}"
             )
@@ -107,26 +133,42 @@ def secure_credentials_file(file_path: Path):
         print_warning(f"Не вдалося посилити права доступу до файлу: {e}")
 
 
-def encrypt_credentials(username: str, password: str, encryption_key: bytes) -> bytes:
-    import json as _json
-    cipher = Fernet(encryption_key)
-    data = _json.dumps({"u": username, "p": password}).encode()
-    return cipher.encrypt(data)
+class CredentialsCipher:
+    """
+    Шифрування облікових даних одним Fernet-екземпляром.
 
+    Ключ виводиться (PBKDF2) із секрету один раз при створенні; encrypt/decrypt
+    на тому самому об'єкті не повторюють ні KDF, ні розбір ключа Fernet.
+    Без salt генерується нова сіль — її треба зберегти поруч із шифротекстом.
+    """
+
+    def __init__(self, secret: str | bytes, salt: bytes | None = None):
+        from cryptography.fernet import Fernet
+
+        key, self.salt = generate_encryption_key(secret, salt)
+        self._fernet = Fernet(key)
+
+    def encrypt(self, username: str, password: str) -> bytes:
+        import json as _json
+
+        data = _json.dumps({"u": username, "p": password}).encode()
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, encrypted_data: bytes, quiet: bool = False):
+        import json as _json
+
+        try:
+            text = self._fernet.decrypt(encrypted_data).decode()
+            # Зворотна сумісність: старий формат "username:password"
+            if text.startswith("{"):
+                obj = _json.loads(text)
+                return obj["u"], obj["p"]
+            else:
+                username, password = text.split(":", 1)
+                return username, password
+        except Exception as e:
+            # quiet: викликач перебирає кілька ключів і сам повідомляє про невдачу
+            if not quiet:
+                print_error(f"Помилка розшифрування облікових даних: {e}")
+            return None, None
 
-def decrypt_credentials(encrypted_data: bytes, encryption_key: bytes):
-    import json as _json
-    try:
-        cipher = Fernet(encryption_key)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        text = decrypted_data.decode()
-        # Зворотна сумісність: старий формат "username:password"
-        if text.startswith("{"):
-            obj = _json.loads(text)
-            return obj["u"], obj["p"]
-        else:
-            username, password = text.split(":", 1)
-            return username, password
-    except Exception as e:
-        print_error(f"Помилка розшифрування облікових даних: {e}")
-        return None, None
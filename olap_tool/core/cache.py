@@ -0,0 +1,78 @@
+"""
+Файловий кеш результатів метаданих OLAP між запусками.
+
+Зараз кешується лише список доступних тижнів: він змінюється щонайбільше
+раз на тиждень, а запит до куба коштує окремий round-trip на кожен запуск
+(особливо помітно в daemon/scheduler режимі). Формат — JSON, без pickle.
+"""
+
+import datetime
+import json
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+_AVAILABLE_WEEKS_FILE = "available_weeks.json"
+
+
+def _cache_key(server: str, database: str) -> str:
+    return f"{server}|{database}"
+
+
+def _read_cache_file(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def load_available_weeks(
+    cache_dir: str, server: str, database: str, ttl_seconds: int
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    Повертає закешований список (рік, тиждень) або None, якщо кешу немає чи він застарів.
+
+    Запис вважається застарілим, якщо старший за ttl_seconds або збережений
+    у попередньому ISO-тижні (у куб могли завантажити новий тиждень).
+    ttl_seconds <= 0 вимикає кеш.
+    """
+    if ttl_seconds <= 0:
+        return None
+    entry = _read_cache_file(Path(cache_dir) / _AVAILABLE_WEEKS_FILE).get(_cache_key(server, database))
+    if not isinstance(entry, dict):
+        return None
+    try:
+        saved_at = float(entry["saved_at"])
+        saved_week = tuple(entry["iso_week"])
+        weeks = [(int(year), int(week)) for year, week in entry["weeks"]]
+    except (KeyError, TypeError, ValueError):
+        return None
+    if time.time() - saved_at > ttl_seconds:
+        return None
+    if saved_week != tuple(datetime.date.today().isocalendar()[:2]):
+        return None
+    return weeks
+
+
+def save_available_weeks(
+    cache_dir: str, server: str, database: str, weeks: List[Tuple[int, int]]
+) -> None:
+    """Зберігає список доступних тижнів. Помилки запису ігноруються — кеш лише оптимізація."""
+    path = Path(cache_dir) / _AVAILABLE_WEEKS_FILE
+    data = _read_cache_file(path)
+    data[_cache_key(server, database)] = {
+        "saved_at": time.time(),
+        "iso_week": list(datetime.date.today().isocalendar()[:2]),
+        "weeks": [list(pair) for pair in weeks],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        # Атомарна заміна: паралельний запуск не прочитає напівзаписаний файл
+        tmp_path.replace(path)
+    except OSError:
+        pass
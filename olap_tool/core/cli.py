@@ -128,6 +128,12 @@ def parse_arguments(argv: "list[str] | None" = None) -> argparse.Namespace:
         metavar='SECONDS',
         help='Таймаут між запитами в секундах'
     )
+    export_group.add_argument(
+        '--max-concurrency',
+        type=int,
+        metavar='N',
+        help='Кількість паралельних запитів (окреме з\'єднання на кожен; за замовчуванням 1)'
+    )
     export_group.add_argument(
         '--compress',
         type=str,
@@ -233,4 +239,8 @@ def validate_arguments(args: argparse.Namespace) -> bool:
         print_error(f"Значення --timeout має бути не менше 0, отримано: {args.timeout}")
         return False
 
+    if args.max_concurrency is not None and args.max_concurrency < 1:
+        print_error(f"Значення --max-concurrency має бути більше 0, отримано: {args.max_concurrency}")
+        return False
+
     return True
@@ -2,18 +2,92 @@
 Модуль для стиснення експортованих файлів у ZIP архіви.
 """
 
+import os
+import stat
 import zipfile
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from .utils import print_info, print_success, print_warning, print_error, format_file_size
 
 
+# XLSX — це вже стиснутий ZIP: повторний DEFLATE лише витрачає CPU
+_STORED_SUFFIXES = (".xlsx", ".zip")
+
+
+def _write_to_zip(zipf: zipfile.ZipFile, file_path: str, compress_level: int) -> None:
+    """Додає файл до архіву: вже стиснуті формати без DEFLATE, решта — з compress_level."""
+    if file_path.lower().endswith(_STORED_SUFFIXES):
+        zipf.write(file_path, arcname=Path(file_path).name, compress_type=zipfile.ZIP_STORED)
+    else:
+        zipf.write(
+            file_path, arcname=Path(file_path).name,
+            compress_type=zipfile.ZIP_DEFLATED, compresslevel=compress_level,
+        )
+
+
+def _stat_regular_file(
+    file_path: str, warn: Callable[[str], None] = print_warning
+) -> Optional[os.stat_result]:
+    """
+    Один stat замість exists() + is_file() + stat(): повертає os.stat_result
+    або None з попередженням через warn, якщо файл відсутній чи не є
+    звичайним файлом. Фоновий потік передає warn, що відкладає вивід.
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
+        warn(f"Файл не знайдено, пропускаємо: {file_path}")
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        warn(f"Не є файлом, пропускаємо: {file_path}")
+        return None
+    return file_stat
+
+
+def _finish_archive(
+    output_path_obj: Path,
+    added_files: List[str],
+    total_original_size: int,
+    keep_originals: bool,
+) -> Optional[str]:
+    """Підсумок по закритому архіву; видаляє порожній архів і, за потреби, оригінали."""
+    file_count = len(added_files)
+    if file_count == 0:
+        print_error("Жоден файл не був доданий до архіву")
+        if output_path_obj.exists():
+            output_path_obj.unlink()
+        return None
+
+    compressed_size = output_path_obj.stat().st_size
+    compression_ratio = (1 - compressed_size / total_original_size) * 100 if total_original_size > 0 else 0
+
+    original_size_str = format_file_size(total_original_size)
+    compressed_size_str = format_file_size(compressed_size)
+
+    print_success(f"Створено архів: {output_path_obj}")
+    print_info(f"  Файлів у архіві: {file_count}")
+    print_info(f"  Оригінальний розмір: {original_size_str}")
+    print_info(f"  Розмір архіву: {compressed_size_str}")
+    print_info(f"  Ступінь стиснення: {compression_ratio:.1f}%")
+
+    if not keep_originals:
+        for file_path in added_files:
+            file_obj = Path(file_path)
+            if file_obj.exists() and file_obj.is_file():
+                file_obj.unlink()
+        print_info(f"Видалено {file_count} оригінальних файлів")
+
+    return str(output_path_obj)
+
+
 def compress_files(
     files: List[str],
     output_path: Optional[str] = None,
-    keep_originals: bool = True
+    keep_originals: bool = True,
+    compress_level: int = 1,
 ) -> Optional[str]:
     """
     Стиснення списку файлів у ZIP архів.
@@ -22,6 +96,7 @@ def compress_files(
         files: Список шляхів до файлів для стиснення
         output_path: Шлях до вихідного ZIP файлу (опційно)
         keep_originals: Зберігати оригінальні файли після стиснення
+        compress_level: Рівень DEFLATE для нестиснутих файлів (CSV)
 
     Returns:
         str: Шлях до створеного ZIP архіву або None при помилці
@@ -39,50 +114,19 @@ def compress_files(
 
     try:
         total_original_size = 0
-        file_count = 0
+        added_files: List[str] = []
 
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zipf:
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for file_path in files:
-                file_obj = Path(file_path)
-
-                if not file_obj.exists():
-                    print_warning(f"Файл не знайдено, пропускаємо: {file_path}")
+                file_stat = _stat_regular_file(file_path)
+                if file_stat is None:
                     continue
 
-                if not file_obj.is_file():
-                    print_warning(f"Не є файлом, пропускаємо: {file_path}")
-                    continue
-
-                zipf.write(file_path, arcname=file_obj.name)
-                total_original_size += file_obj.stat().st_size
-                file_count += 1
-
-        if file_count == 0:
-            print_error("Жоден файл не був доданий до архіву")
-            if output_path_obj.exists():
-                output_path_obj.unlink()
-            return None
-
-        compressed_size = output_path_obj.stat().st_size
-        compression_ratio = (1 - compressed_size / total_original_size) * 100 if total_original_size > 0 else 0
-
-        original_size_str = format_file_size(total_original_size)
-        compressed_size_str = format_file_size(compressed_size)
-
-        print_success(f"Створено архів: {output_path}")
-        print_info(f"  Файлів у архіві: {file_count}")
-        print_info(f"  Оригінальний розмір: {original_size_str}")
-        print_info(f"  Розмір архіву: {compressed_size_str}")
-        print_info(f"  Ступінь стиснення: {compression_ratio:.1f}%")
+                _write_to_zip(zipf, file_path, compress_level)
+                total_original_size += file_stat.st_size
+                added_files.append(file_path)
 
-        if not keep_originals:
-            for file_path in files:
-                file_obj = Path(file_path)
-                if file_obj.exists() and file_obj.is_file():
-                    file_obj.unlink()
-            print_info(f"Видалено {file_count} оригінальних файлів")
-
-        return str(output_path_obj)
+        return _finish_archive(output_path_obj, added_files, total_original_size, keep_originals)
 
     except Exception as e:
         print_error(f"Помилка при створенні ZIP архіву: {e}")
@@ -94,3 +138,79 @@ def compress_files(
                 pass
         return None
 
+
+
+class BackgroundCompressor:
+    """
+    Додає файли до ZIP архіву у фоновому потоці по мірі їх створення.
+
+    Стиснення перекривається з наступними OLAP запитами замість окремого
+    кроку після всіх тижнів. Фоновий потік нічого не друкує — попередження,
+    помилки та підсумок виводить finish() з головного потоку.
+    """
+
+    def __init__(self, output_path: str, keep_originals: bool = True, compress_level: int = 1):
+        self.output_path = Path(output_path)
+        self.keep_originals = keep_originals
+        self.compress_level = compress_level
+        # Один потік: записи в ZipFile мають іти послідовно
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zip")
+        self._zipf: Optional[zipfile.ZipFile] = None
+        self._added_files: List[str] = []
+        self._warnings: List[str] = []
+        self._total_original_size = 0
+        self._error: Optional[Exception] = None
+        self._closed = False
+
+    def submit(self, file_path: str) -> None:
+        """Ставить файл у чергу на стиснення і одразу повертає керування."""
+        self._executor.submit(self._add, file_path)
+
+    def _add(self, file_path: str) -> None:
+        if self._error is not None:
+            return
+        # Попередження з фонового потоку виводяться в finish()
+        file_stat = _stat_regular_file(file_path, warn=self._warnings.append)
+        if file_stat is None:
+            return
+        try:
+            if self._zipf is None:
+                self._zipf = zipfile.ZipFile(self.output_path, 'w', zipfile.ZIP_DEFLATED)
+            _write_to_zip(self._zipf, file_path, self.compress_level)
+            self._total_original_size += file_stat.st_size
+            self._added_files.append(file_path)
+        except Exception as e:
+            self._error = e
+
+    def close(self) -> None:
+        """Чекає на чергу і закриває архів. Повторний виклик нічого не робить."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        if self._zipf is not None:
+            try:
+                self._zipf.close()
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+
+    def finish(self) -> Optional[str]:
+        """
+        Завершує архів і виводить підсумок.
+
+        Returns:
+            str: Шлях до створеного ZIP архіву або None при помилці
+        """
+        self.close()
+        for message in self._warnings:
+            print_warning(message)
+        if self._error is not None:
+            print_error(f"Помилка при створенні ZIP архіву: {self._error}")
+            if self.output_path.exists():
+                try:
+                    self.output_path.unlink()
+                except Exception:
+                    pass
+            return None
+        return _finish_archive(self.output_path, self._added_files, self._total_original_size, self.keep_originals)
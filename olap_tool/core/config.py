@@ -4,6 +4,7 @@
 Пріоритет: defaults -> config.yaml -> .env (тільки секрети) -> profile.yaml -> CLI args
 """
 
+import copy
 import os
 import warnings
 from dataclasses import dataclass, field, fields as dataclass_fields
@@ -41,6 +42,10 @@ class QueryConfig:
     year_week_start: Optional[str] = None
     year_week_end: Optional[str] = None
     timeout: int = 30
+    # Скільки секунд (не довше поточного ISO-тижня) тримати список доступних тижнів; 0 — без кешу
+    available_weeks_cache_ttl: int = 21600
+    # Паралельні запити до куба (окреме з'єднання на кожен); 1 — послідовно
+    max_concurrency: int = 1
 
 
 @dataclass
@@ -48,6 +53,7 @@ class ExportConfig:
     format: str = "xlsx"
     force_csv_only: bool = False
     compress: str = "none"
+    compress_level: int = 1
 
 
 @dataclass
@@ -74,6 +80,7 @@ class ExcelHeaderConfig:
 class PathsConfig:
     adomd_dll: str = "./lib"
     result_dir: str = "result"
+    cache_dir: str = ".cache"
 
 
 @dataclass
@@ -217,19 +224,33 @@ def load_postgres_from_env() -> PostgreSQLConfig:
 # Step 2: load config.yaml
 # ---------------------------------------------------------------------------
 
+# Розібраний config.yaml: шлях -> (mtime_ns, розмір, дані). build_config()
+# викликається на кожен запуск daemon/scheduler — YAML парситься повторно
+# лише після зміни файлу
+_config_yaml_cache: dict = {}
+
+
 def load_config_yaml(path: str = "config.yaml") -> dict:
     """Читає config.yaml; повертає {} якщо файл відсутній або yaml недоступний."""
     if not YAML_AVAILABLE or yaml is None:
         return {}
-    p = Path(path)
-    if not p.exists():
+    p = Path(path).resolve()
+    try:
+        stat = p.stat()
+    except OSError:
         return {}
+    cached = _config_yaml_cache.get(p)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        # Копія: наступні кроки build_config змінюють словник на місці
+        return copy.deepcopy(cached[2])
     try:
         with open(p, "r", encoding="utf-8") as f:
             data = yaml.safe_load(f)
-        return data if isinstance(data, dict) else {}
     except Exception:
         return {}
+    data = data if isinstance(data, dict) else {}
+    _config_yaml_cache[p] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(data))
+    return data
 
 
 # ---------------------------------------------------------------------------
@@ -325,6 +346,9 @@ def apply_cli_overrides(base: dict, args) -> dict:
     if getattr(args, "timeout", None) is not None:
         base.setdefault("query", {})
         base["query"]["timeout"] = args.timeout
+    if getattr(args, "max_concurrency", None) is not None:
+        base.setdefault("query", {})
+        base["query"]["max_concurrency"] = args.max_concurrency
     if getattr(args, "compress", None):
         base.setdefault("export", {})
         base["export"]["compress"] = args.compress
@@ -0,0 +1,128 @@
+"""
+Вибір списку тижнів для експорту з CLI аргументів, профілю та config.yaml.
+
+Пріоритет джерел:
+1. Автоматичні періоди з CLI (--last-weeks, --current-month, ...)
+2. Ручні періоди з CLI (--period, --start/--end)
+3. Період з профілю (period.type: auto | manual)
+4. query.year_week_start / query.year_week_end з config
+"""
+
+from typing import List, Optional, Tuple
+
+from . import periods
+from .utils import print_info
+
+
+# auto_type -> (функція розрахунку тижнів, чи потребує значення N)
+_AUTO_PERIOD_DISPATCH = {
+    "last-weeks": (periods.calculate_last_weeks, True),
+    "current-month": (periods.calculate_current_month, False),
+    "last-month": (periods.calculate_last_month, False),
+    "current-quarter": (periods.calculate_current_quarter, False),
+    "last-quarter": (periods.calculate_last_quarter, False),
+    "year-to-date": (periods.calculate_year_to_date, False),
+    "rolling-weeks": (periods.calculate_rolling_weeks, True),
+}
+
+# Атрибут CLI -> auto_type; порядок задає пріоритет, якщо вказано кілька прапорців
+_CLI_AUTO_PERIODS = (
+    ("last_weeks", "last-weeks"),
+    ("current_month", "current-month"),
+    ("last_month", "last-month"),
+    ("current_quarter", "current-quarter"),
+    ("last_quarter", "last-quarter"),
+    ("year_to_date", "year-to-date"),
+    ("rolling_weeks", "rolling-weeks"),
+)
+
+
+def _find_cli_auto_period(args):
+    """Перший заданий автоматичний період з CLI як (auto_type, значення) або None."""
+    for attr, auto_type in _CLI_AUTO_PERIODS:
+        value = getattr(args, attr, None)
+        if value:
+            return auto_type, value
+    return None
+
+
+def _calculate_auto_period(auto_type, auto_value, available_set):
+    """Розраховує тижні автоматичного періоду і залишає лише наявні в кубі."""
+    entry = _AUTO_PERIOD_DISPATCH.get(auto_type)
+    if entry is None:
+        return None
+    calculate, takes_value = entry
+    if takes_value and not auto_value:
+        return None
+    calculated_weeks = calculate(auto_value) if takes_value else calculate()
+    return periods.filter_by_available_weeks(calculated_weeks, available_set)
+
+
+def resolve_year_week_pairs(
+    args,
+    profile_config: Optional[dict],
+    start_period: Optional[str],
+    end_period: Optional[str],
+    available_weeks: List[Tuple[int, int]],
+) -> Tuple[Optional[List[Tuple[int, int]]], Optional[str], Optional[str]]:
+    """
+    Повертає (список (рік, тиждень) або None/[], початок, кінець періоду).
+
+    Початок і кінець — для блоку налаштувань: межі --period, якщо спрацювала
+    саме ця гілка, інакше start_period/end_period з config без змін.
+
+    Args:
+        args: Розпарсені CLI аргументи
+        profile_config: Завантажений профіль (може бути порожнім)
+        start_period, end_period: query.year_week_start/end з config
+        available_weeks: Доступні тижні з OLAP кубу
+
+    Raises:
+        ValueError: --period не у форматі YYYY-WW:YYYY-WW
+    """
+    # data.queries тягне pandas — імпорт лише коли період справді розраховується
+    from ..data.queries import generate_year_week_pairs
+
+    # Множина будується один раз і йде в усі гілки — і автоматичні, і ручні періоди
+    available_set = frozenset(available_weeks)
+
+    # Пріоритет 1: Автоматичні періоди з CLI
+    cli_auto_period = _find_cli_auto_period(args)
+    if cli_auto_period:
+        return _calculate_auto_period(*cli_auto_period, available_set), start_period, end_period
+
+    # Пріоритет 2: Ручні періоди з CLI
+    if args.period:
+        period_start, period_end = args.period.split(":")
+        return generate_year_week_pairs(period_start, period_end, available_set), period_start, period_end
+    if args.start and args.end:
+        return generate_year_week_pairs(args.start, args.end, available_set), start_period, end_period
+
+    return _resolve_config_period(profile_config, start_period, end_period, available_set), start_period, end_period
+
+
+def _resolve_config_period(profile_config, start_period, end_period, available_set):
+    """Пріоритети 3-4: період з профілю, інакше query.year_week_start/end з config."""
+    from ..data.queries import generate_year_week_pairs
+
+    # Пріоритет 3: Періоди з профілю
+    if profile_config and "period" in profile_config:
+        period_cfg = profile_config["period"]
+        period_type = period_cfg.get("type")
+
+        if period_type == "auto":
+            auto_type = period_cfg.get("auto_type")
+            print_info(f"Використання періоду з профілю: {auto_type}")
+            return _calculate_auto_period(auto_type, period_cfg.get("auto_value"), available_set)
+
+        if period_type == "manual":
+            manual_start = period_cfg.get("start")
+            manual_end = period_cfg.get("end")
+            if manual_start and manual_end:
+                return generate_year_week_pairs(manual_start, manual_end, available_set)
+        return None
+
+    # Пріоритет 4: Періоди з config
+    if start_period and end_period:
+        return generate_year_week_pairs(start_period, end_period, available_set)
+    return None
@@ -10,17 +10,67 @@
 """
 
 import datetime
-from typing import List, Tuple
+import time
+from typing import AbstractSet, List, Optional, Tuple, Union
 
 from .utils import print_info, print_warning, print_error
 
 
-def calculate_last_weeks(n: int) -> List[Tuple[int, int]]:
+# Кеш поточної дати: в межах одного запуску "сьогодні" незмінне, а TTL
+# не дає daemon-процесу працювати з учорашньою датою після півночі
+_TODAY_TTL_SECONDS = 60.0
+_today_cache: Optional[Tuple[datetime.date, Tuple[int, int, int], float]] = None
+
+
+def _today_entry() -> Tuple[datetime.date, Tuple[int, int, int], float]:
+    """Повертає (дата, ISO-календар, момент протермінування), оновлюючи кеш за потреби."""
+    global _today_cache
+    entry = _today_cache
+    now = time.monotonic()
+    if entry is None or now >= entry[2]:
+        today = datetime.date.today()
+        year, week, weekday = today.isocalendar()
+        entry = (today, (year, week, weekday), now + _TODAY_TTL_SECONDS)
+        _today_cache = entry
+    return entry
+
+
+def _today() -> datetime.date:
+    """Поточна дата (кешується на _TODAY_TTL_SECONDS секунд)."""
+    return _today_entry()[0]
+
+
+def _today_isocalendar() -> Tuple[int, int, int]:
+    """ISO (year, week, weekday) поточної дати з того ж кешу."""
+    return _today_entry()[1]
+
+
+def reset_today_cache() -> None:
+    """Скидає кеш поточної дати (наступний виклик перечитає годинник)."""
+    global _today_cache
+    _today_cache = None
+
+
+def iso_weeks_in_year(year: int) -> int:
+    """
+    Кількість ISO тижнів у році (52 або 53) — чиста цілочисельна арифметика.
+
+    Рік має 53 тижні, якщо 1 січня припадає на четвер, або високосний рік
+    починається в середу.
+    """
+    def p(y: int) -> int:
+        return (y + y // 4 - y // 100 + y // 400) % 7
+
+    return 53 if p(year) == 4 or p(year - 1) == 3 else 52
+
+
+def calculate_last_weeks(n: int, today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок останніх N тижнів (включно з поточним).
 
     Args:
         n: Кількість тижнів
+        today: Опорна дата (за замовчуванням — сьогодні)
 
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
@@ -29,30 +79,39 @@ def calculate_last_weeks(n: int) -> List[Tuple[int, int]]:
         print_error(f"Кількість тижнів має бути більше 0, отримано: {n}")
         return []
 
-    today = datetime.date.today()
-    weeks = []
+    if today is None:
+        year, week, _ = _today_isocalendar()
+    else:
+        year, week, _ = today.isocalendar()
 
-    for i in range(n):
-        # Віднімаємо i тижнів від сьогодні
-        date = today - datetime.timedelta(weeks=i)
-        year, week, _ = date.isocalendar()
+    # Крокуємо назад по ISO тижнях без створення date/timedelta об'єктів;
+    # кожен крок дає унікальний тиждень, тож дедуплікація не потрібна
+    weeks = []
+    for _ in range(n):
         weeks.append((year, week))
+        week -= 1
+        if week == 0:
+            year -= 1
+            week = iso_weeks_in_year(year)
 
-    # Видаляємо дублікати та сортуємо по зростанню
-    unique_weeks = sorted(set(weeks))
+    weeks.reverse()
 
-    print_info(f"Розраховано останніх {n} тижнів: {len(unique_weeks)} унікальних періодів")
-    return unique_weeks
+    print_info(f"Розраховано останніх {n} тижнів: {len(weeks)} унікальних періодів")
+    return weeks
 
 
-def calculate_current_month() -> List[Tuple[int, int]]:
+def calculate_current_month(today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок всіх тижнів поточного місяця.
 
+    Args:
+        today: Опорна дата (за замовчуванням — сьогодні)
+
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
     """
-    today = datetime.date.today()
+    if today is None:
+        today = _today()
     year = today.year
     month = today.month
 
@@ -61,14 +120,18 @@ def calculate_current_month() -> List[Tuple[int, int]]:
     return weeks
 
 
-def calculate_last_month() -> List[Tuple[int, int]]:
+def calculate_last_month(today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок всіх тижнів попереднього місяця.
 
+    Args:
+        today: Опорна дата (за замовчуванням — сьогодні)
+
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
     """
-    today = datetime.date.today()
+    if today is None:
+        today = _today()
     # Перехід на попередній місяць
     first_day_current_month = today.replace(day=1)
     last_day_prev_month = first_day_current_month - datetime.timedelta(days=1)
@@ -81,14 +144,18 @@ def calculate_last_month() -> List[Tuple[int, int]]:
     return weeks
 
 
-def calculate_current_quarter() -> List[Tuple[int, int]]:
+def calculate_current_quarter(today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок всіх тижнів поточного кварталу (Q1-Q4).
 
+    Args:
+        today: Опорна дата (за замовчуванням — сьогодні)
+
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
     """
-    today = datetime.date.today()
+    if today is None:
+        today = _today()
     year = today.year
     month = today.month
 
@@ -100,14 +167,18 @@ def calculate_current_quarter() -> List[Tuple[int, int]]:
     return weeks
 
 
-def calculate_last_quarter() -> List[Tuple[int, int]]:
+def calculate_last_quarter(today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок всіх тижнів попереднього кварталу.
 
+    Args:
+        today: Опорна дата (за замовчуванням — сьогодні)
+
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
     """
-    today = datetime.date.today()
+    if today is None:
+        today = _today()
     year = today.year
     month = today.month
 
@@ -125,14 +196,18 @@ def calculate_last_quarter() -> List[Tuple[int, int]]:
     return weeks
 
 
-def calculate_year_to_date() -> List[Tuple[int, int]]:
+def calculate_year_to_date(today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок всіх тижнів з початку року до сьогодні.
 
+    Args:
+        today: Опорна дата (за замовчуванням — сьогодні)
+
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
     """
-    today = datetime.date.today()
+    if today is None:
+        today = _today()
     year = today.year
 
     # Перший день року
@@ -149,28 +224,25 @@ def calculate_year_to_date() -> List[Tuple[int, int]]:
     # Генерація всіх тижнів від початку року до сьогодні
     while (current_year < end_year) or (current_year == end_year and current_week <= end_week):
         weeks.append((current_year, current_week))
-        current_week += 1
-
-        # Обробка переходу на наступний рік (після тижня 52/53)
-        # Перевіряємо чи існує тиждень current_week в current_year
-        try:
-            # Використовуємо четвер тижня для визначення року (ISO 8601)
-            test_date = datetime.date.fromisocalendar(current_year, current_week, 4)
-        except ValueError:
-            # Тиждень не існує в поточному році, переходимо на наступний
+
+        # Перехід на наступний рік після останнього (52/53) тижня
+        if current_week >= iso_weeks_in_year(current_year):
             current_week = 1
             current_year += 1
+        else:
+            current_week += 1
 
     print_info(f"Розраховано тижні з початку року ({year}): {len(weeks)} тижнів")
     return weeks
 
 
-def calculate_rolling_weeks(n: int) -> List[Tuple[int, int]]:
+def calculate_rolling_weeks(n: int, today: Optional[datetime.date] = None) -> List[Tuple[int, int]]:
     """
     Розрахунок ковзаючого вікна N тижнів (закінчується поточним тижнем).
 
     Args:
         n: Розмір вікна в тижнях
+        today: Опорна дата (за замовчуванням — сьогодні)
 
     Returns:
         List[Tuple[int, int]]: Список пар (year, week)
@@ -181,7 +253,7 @@ def calculate_rolling_weeks(n: int) -> List[Tuple[int, int]]:
 
     # calculate_rolling_weeks працює аналогічно до calculate_last_weeks
     # але з більш явною назвою для ковзаючого вікна
-    return calculate_last_weeks(n)
+    return calculate_last_weeks(n, today)
 
 
 def get_weeks_in_month(year: int, month: int) -> List[Tuple[int, int]]:
@@ -250,20 +322,28 @@ def get_weeks_in_quarter(year: int, quarter: int) -> List[Tuple[int, int]]:
 
 def filter_by_available_weeks(
     calculated_weeks: List[Tuple[int, int]],
-    available_weeks: List[Tuple[int, int]]
+    available_weeks: Union[List[Tuple[int, int]], AbstractSet[Tuple[int, int]]]
 ) -> List[Tuple[int, int]]:
     """
     Фільтрація розрахованих тижнів по доступним тижням з OLAP кубу.
 
     Args:
         calculated_weeks: Розраховані тижні
-        available_weeks: Доступні тижні з OLAP кубу
+        available_weeks: Доступні тижні з OLAP кубу; готовий set/frozenset
+            використовується як є, без повторної побудови
 
     Returns:
         List[Tuple[int, int]]: Відфільтровані тижні
     """
-    available_set = set(available_weeks)
-    filtered = [(y, w) for y, w in calculated_weeks if (y, w) in available_set]
+    if isinstance(available_weeks, AbstractSet):
+        available_set = available_weeks
+    else:
+        available_set = frozenset(available_weeks)
+    # Типовий випадок — усі розраховані тижні вже є в кубі
+    if all(pair in available_set for pair in calculated_weeks):
+        return calculated_weeks
+    # Пари вже хешовані кортежі — перевіряємо їх напряму, без розпакування
+    filtered = [pair for pair in calculated_weeks if pair in available_set]
 
     if len(filtered) < len(calculated_weeks):
         diff = len(calculated_weeks) - len(filtered)
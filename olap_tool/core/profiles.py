@@ -5,6 +5,7 @@
 Профілі можуть перевизначати будь-яку секцію з config.yaml.
 """
 
+import copy
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Type
 
@@ -23,6 +24,11 @@ from .utils import print_info, print_warning, print_error
 # Директорія для зберігання профілів (відносно кореня проєкту)
 PROFILES_DIR = Path(__file__).resolve().parent.parent.parent / "profiles"
 
+# Розібрані профілі: шлях -> (mtime_ns, розмір, дані). Daemon/scheduler
+# завантажують той самий профіль на кожен запуск — YAML парситься повторно
+# лише після зміни файлу
+_profile_cache: Dict[Path, tuple] = {}
+
 
 def ensure_profiles_dir() -> None:
     """Створення директорії для профілів якщо не існує."""
@@ -45,42 +51,32 @@ def load_profile(profile_name: str, silent: bool = False) -> Optional[Dict[str,
         print_error("PyYAML не встановлено. Виконайте: pip install PyYAML>=6.0.0")
         return None
 
-    ensure_profiles_dir()
-
     profile_path = get_profile_path(profile_name)
 
-    if not profile_path.exists():
+    # Один stat на виклик: він же перевіряє наявність файлу і ключ кешу.
+    # Директорія профілів створюється лише коли профіль не знайдено
+    try:
+        stat = profile_path.stat()
+    except FileNotFoundError:
+        ensure_profiles_dir()
         print_error(f"Профіль '{profile_name}' не знайдено: {profile_path}")
         print_info("Використовуйте --list-profiles для перегляду доступних профілів")
         return None
+    except OSError as e:
+        print_error(f"Помилка завантаження профілю '{profile_name}': {e}")
+        return None
 
     try:
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            profile_data = yaml.safe_load(f)
-
-        if not profile_data:
-            print_error(f"Профіль '{profile_name}' порожній або некоректний")
-            return None
-
-        # Зворотна сумісність: export.streaming -> xlsx.streaming
-        if "export" in profile_data:
-            export_cfg = profile_data["export"]
-            if "streaming" in export_cfg:
-                profile_data.setdefault("xlsx", {})
-                profile_data["xlsx"]["streaming"] = export_cfg.pop("streaming")
-            if "min_format" in export_cfg:
-                profile_data.setdefault("xlsx", {})
-                profile_data["xlsx"]["min_format"] = export_cfg.pop("min_format")
-
-        # Зворотна сумісність: filter.fg1_name -> query.filter_fg1_name
-        if "filter" in profile_data and "fg1_name" in profile_data["filter"]:
-            profile_data.setdefault("query", {})
-            profile_data["query"]["filter_fg1_name"] = profile_data["filter"]["fg1_name"]
-
-        # Зворотна сумісність: connection.timeout -> query.timeout
-        if "connection" in profile_data and "timeout" in profile_data["connection"]:
-            profile_data.setdefault("query", {})
-            profile_data["query"]["timeout"] = profile_data["connection"]["timeout"]
+        cached = _profile_cache.get(profile_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            # Копія: викликачі можуть змінювати словник профілю
+            profile_data = copy.deepcopy(cached[2])
+        else:
+            profile_data = _parse_profile_file(profile_path)
+            if not profile_data:
+                print_error(f"Профіль '{profile_name}' порожній або некоректний")
+                return None
+            _profile_cache[profile_path] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(profile_data))
 
         if not silent:
             print_info(f"Завантажено профіль: {profile_name}")
@@ -97,6 +93,40 @@ def load_profile(profile_name: str, silent: bool = False) -> Optional[Dict[str,
         return None
 
 
+def _parse_profile_file(profile_path: Path) -> Optional[Dict[str, Any]]:
+    """Читає YAML профілю і мігрує застарілі ключі. Повертає None для порожнього файлу."""
+    if yaml is None:
+        print_error("PyYAML не встановлено. Виконайте: pip install PyYAML>=6.0.0")
+        return None
+    with open(profile_path, 'r', encoding='utf-8') as f:
+        profile_data = yaml.safe_load(f)
+
+    if not profile_data:
+        return None
+
+    # Зворотна сумісність: export.streaming -> xlsx.streaming
+    if "export" in profile_data:
+        export_cfg = profile_data["export"]
+        if "streaming" in export_cfg:
+            profile_data.setdefault("xlsx", {})
+            profile_data["xlsx"]["streaming"] = export_cfg.pop("streaming")
+        if "min_format" in export_cfg:
+            profile_data.setdefault("xlsx", {})
+            profile_data["xlsx"]["min_format"] = export_cfg.pop("min_format")
+
+    # Зворотна сумісність: filter.fg1_name -> query.filter_fg1_name
+    if "filter" in profile_data and "fg1_name" in profile_data["filter"]:
+        profile_data.setdefault("query", {})
+        profile_data["query"]["filter_fg1_name"] = profile_data["filter"]["fg1_name"]
+
+    # Зворотна сумісність: connection.timeout -> query.timeout
+    if "connection" in profile_data and "timeout" in profile_data["connection"]:
+        profile_data.setdefault("query", {})
+        profile_data["query"]["timeout"] = profile_data["connection"]["timeout"]
+
+    return profile_data
+
+
 def list_profiles() -> List[str]:
     """
     Отримання списку доступних профілів.
@@ -1,10 +1,12 @@
-import itertools
+import os
 import sys
 import threading
 import time
+from collections import deque
+from statistics import fmean
+from typing import AnyStr, BinaryIO, Callable
 
-from .utils import format_time, get_current_time
-from colorama import Fore
+from .utils import format_time, get_current_time, init_colorama
 
 
 animation_stop_event = threading.Event()
@@ -15,10 +17,42 @@ _debug = False
 _query_timeout = 30
 _progress_update_interval_ms = 100
 
-SPINNER_FRAMES = [
-    "⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷",
-]
-COUNTDOWN_ICON = "⏱️"
+
+def _stdout_is_tty() -> bool:
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+_is_tty = _stdout_is_tty()
+
+# Інтервал простих рядків прогресу, коли stdout — файл або пайп (секунди)
+_NON_TTY_INTERVAL = 5.0
+
+_UNICODE_SPINNER_FRAMES = ("⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷")
+_ASCII_SPINNER_FRAMES = ("-", "\\", "|", "/")
+_UNICODE_COUNTDOWN_ICON = "⏱️"
+_ASCII_COUNTDOWN_ICON = "*"
+
+SPINNER_FRAMES = _UNICODE_SPINNER_FRAMES
+COUNTDOWN_ICON = _UNICODE_COUNTDOWN_ICON
+
+# Повернення каретки + ESC[K (erase to end of line)
+_CLEAR_LINE = "\r\x1b[K"
+# Кольори кадрів — ті самі SGR-коди, що й colorama Fore/Style, але без
+# звернень до атрибутів colorama при кожному запуску спінера/відліку
+_ANSI_BLUE = "\x1b[34m"
+_ANSI_YELLOW = "\x1b[33m"
+_ANSI_RESET = "\x1b[0m"
+# DEC mode 2026 (synchronized output): термінал малює кадр між маркерами
+# атомарно; термінали без підтримки просто ігнорують приватний режим
+_SYNC_BEGIN = "\x1b[?2026h"
+_SYNC_END = "\x1b[?2026l"
+
+# Запас до оцінки залишку часу за кількістю замірів у вікні (індекс = n, 1..5):
+# що менше замірів, то обережніша оцінка
+_SAFETY_FACTORS = (1.2, 1.2, 1.1, 1.05, 1.05, 1.05)
 
 
 def init_display(
@@ -27,19 +61,27 @@ def init_display(
     query_timeout: int = 30,
     progress_update_interval_ms: int = 100,
 ) -> None:
-    """Ініціалізація модуля після побудови конфігурації."""
-    global _ascii_mode, _debug, _query_timeout, _progress_update_interval_ms
+    """
+    Ініціалізація модуля після побудови конфігурації.
+
+    Єдине джерело display-налаштувань модуля: значення беруться з AppConfig
+    один раз тут, а гарячі шляхи (TimeTracker, спінер, countdown) читають
+    лише модульні змінні — без os.getenv на кожне оновлення прогресу.
+    Тут же один раз визначається, чи stdout — термінал.
+    """
+    global _ascii_mode, _debug, _query_timeout, _progress_update_interval_ms, _is_tty
     global SPINNER_FRAMES, COUNTDOWN_ICON
+    _is_tty = _stdout_is_tty()
     _ascii_mode = ascii_logs
     _debug = debug
     _query_timeout = query_timeout
     _progress_update_interval_ms = max(50, min(500, progress_update_interval_ms))
     if _ascii_mode:
-        SPINNER_FRAMES = ["-", "\\", "|", "/"]
-        COUNTDOWN_ICON = "*"
+        SPINNER_FRAMES = _ASCII_SPINNER_FRAMES
+        COUNTDOWN_ICON = _ASCII_COUNTDOWN_ICON
     else:
-        SPINNER_FRAMES = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
-        COUNTDOWN_ICON = "⏱️"
+        SPINNER_FRAMES = _UNICODE_SPINNER_FRAMES
+        COUNTDOWN_ICON = _UNICODE_COUNTDOWN_ICON
 
 
 class TimeTracker:
@@ -47,8 +89,15 @@ class TimeTracker:
         self.total_items = total_items
         self.processed_items = 0
         self.start_time = time.time()
-        self.elapsed_times: list[float] = []
-        self.waiting_times: list[float] = []
+        # Оцінка залишку бере лише останні 5 замірів; підсумки (сума/мін/макс)
+        # ведуться інкрементально, тож повна історія замірів не зберігається
+        self._recent_times: deque[float] = deque(maxlen=5)
+        self._processing_time_sum = 0.0
+        self._processing_time_count = 0
+        self._processing_time_min = float("inf")
+        self._processing_time_max = 0.0
+        self._waiting_time_sum = 0.0
+        self._last_waiting_time = 0.0
         self.last_item_end_time = self.start_time
         self.currently_waiting = False
         self._query_timeout = query_timeout if query_timeout is not None else _query_timeout
@@ -60,46 +109,62 @@ class TimeTracker:
 
     def end_waiting(self):
         if self.currently_waiting:
-            self.waiting_times.append(time.time() - self.wait_start_time)
+            waited = time.time() - self.wait_start_time
+            self._last_waiting_time = waited
+            self._waiting_time_sum += waited
             self.currently_waiting = False
 
-    def update(self, items_processed: int = 1):
+    def update(self, items_processed: int = 1, processing_time: float | None = None):
+        """
+        Фіксує оброблений елемент.
+
+        processing_time — власний замір тривалості (паралельний режим: проміжки
+        між завершеннями потоків не є часом обробки); інакше рахується від
+        завершення попереднього елемента мінус очікування.
+        """
         current_time = time.time()
         if self.currently_waiting:
             self.end_waiting()
-        if self.processed_items == 0:
-            processing_time = current_time - self.start_time
-        else:
-            processing_time = current_time - self.last_item_end_time
-            if self.waiting_times:
-                processing_time -= self.waiting_times[-1]
-        self.elapsed_times.append(processing_time)
+        if processing_time is None:
+            if self.processed_items == 0:
+                processing_time = current_time - self.start_time
+            else:
+                processing_time = current_time - self.last_item_end_time - self._last_waiting_time
+        self._recent_times.append(processing_time)
+        self._processing_time_sum += processing_time
+        self._processing_time_count += 1
+        if processing_time < self._processing_time_min:
+            self._processing_time_min = processing_time
+        if processing_time > self._processing_time_max:
+            self._processing_time_max = processing_time
         self.last_item_end_time = current_time
         self.processed_items += items_processed
 
-    def get_elapsed_time(self):
-        return time.time() - self.start_time
+    def get_elapsed_time(self, now: float | None = None):
+        return (time.time() if now is None else now) - self.start_time
 
     def get_processing_time(self):
-        return sum(self.elapsed_times) if self.elapsed_times else 0
+        return self._processing_time_sum
+
+    def stats(self):
+        """(кількість замірів, середній, мінімальний, максимальний час обробки) або None."""
+        n = self._processing_time_count
+        if n == 0:
+            return None
+        return n, self._processing_time_sum / n, self._processing_time_min, self._processing_time_max
 
     def get_waiting_time(self):
-        return sum(self.waiting_times) if self.waiting_times else 0
+        return self._waiting_time_sum
 
     def get_remaining_processing_time(self):
-        if not self.elapsed_times or self.processed_items == 0:
+        recent_times = self._recent_times
+        if not recent_times or self.processed_items == 0:
             return None
-        num_items_to_use = min(5, len(self.elapsed_times))
-        recent_times = self.elapsed_times[-num_items_to_use:]
-        avg_time_per_item = sum(recent_times) / len(recent_times)
-        if len(self.elapsed_times) < 5 or self.processed_items < self.total_items * 0.1:
-            if len(self.elapsed_times) == 1:
-                safety_factor = 1.2
-            elif len(self.elapsed_times) < 3:
-                safety_factor = 1.1
-            else:
-                safety_factor = 1.05
-            avg_time_per_item *= safety_factor
+        n = len(recent_times)
+        avg_time_per_item = fmean(recent_times)
+        # n < 5 рівнозначно "менше 5 замірів загалом" (maxlen=5)
+        if n < 5 or self.processed_items < self.total_items * 0.1:
+            avg_time_per_item *= _SAFETY_FACTORS[n]
         remaining_items = self.total_items - self.processed_items
         return avg_time_per_item * remaining_items
 
@@ -129,9 +194,10 @@ class TimeTracker:
         )
 
     def get_progress_info(self):
-        elapsed = self.get_elapsed_time()
+        # Один знімок часу на все повідомлення: elapsed і total узгоджені
+        elapsed = self.get_elapsed_time(time.time())
         remaining_total = self.get_remaining_time()
-        total = self.get_total_time()
+        total = elapsed if remaining_total is None else elapsed + remaining_total
         percentage = self.get_percentage_complete()
 
         info = (
@@ -140,41 +206,119 @@ class TimeTracker:
         info += f"Минуло: {format_time(elapsed)}"
         if remaining_total is not None:
             accuracy_note = ""
-            if len(self.elapsed_times) == 1:
+            if self._processing_time_count == 1:
                 accuracy_note = " (дуже приблизно)"
-            elif len(self.elapsed_times) < 3:
+            elif self._processing_time_count < 3:
                 accuracy_note = " (орієнтовно)"
             info += f" | Залишилось: {format_time(remaining_total)}{accuracy_note} | Всього: {format_time(total)}{accuracy_note}"
         return info
 
 
-def loading_spinner(description: str):
-    animation_stop_event.clear()
-    spinner = itertools.cycle(SPINNER_FRAMES)
+def _plain_progress_lines(description: str) -> None:
+    """Прогрес без \\r і кольорів для логів/пайпів: один рядок раз на кілька секунд."""
     start_time = time.time()
-    message = ""
-    while not animation_stop_event.is_set():
-        elapsed = time.time() - start_time
-        elapsed_str = format_time(elapsed)
-        message = f"{Fore.BLUE}[{get_current_time()}] {next(spinner)} {description} | Час: {elapsed_str}"
-        sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
-        sys.stdout.write(message)
+    while not animation_stop_event.wait(_NON_TTY_INTERVAL):
+        now = time.time()
+        sys.stdout.write(
+            f"[{get_current_time(now)}] {description} | Час: {format_time(now - start_time)}\n"
+        )
         sys.stdout.flush()
-        animation_stop_event.wait(0.1)
-    # Очищаємо рядок спінера і переходимо на новий рядок
-    sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
-    sys.stdout.flush()
+
+
+def _spin(
+    description: str,
+    encode: Callable[[str], AnyStr],
+    write: Callable[[AnyStr], None],
+    sync_begin: AnyStr,
+    sync_end: AnyStr,
+) -> None:
+    """
+    Цикл кадрів спінера; кожен кадр — один write() поточного рядка.
+
+    Незмінні частини кадру кодуються один раз через encode, у циклі — лише
+    час і тривалість. encode/write задають шлях виводу: байти у
+    sys.stdout.buffer або текст у sys.stdout (див. loading_spinner).
+    """
+    frames = [encode(frame) for frame in SPINNER_FRAMES]
+    nframes = len(frames)
+    frame_idx = 0
+    interval = _progress_update_interval_ms / 1000
+    # autoreset colorama тут не діє, тому колір скидаємо явно
+    head = encode(_ANSI_BLUE + "[")
+    mid = encode("] ")
+    body = encode(f" {description} | Час: ")
+    tail = encode(_ANSI_RESET)
+    # Очищення рядка фіксованої довжини — без пробілів на ширину попереднього кадру
+    clear = encode(_CLEAR_LINE)
+    prefix = sync_begin + clear + head
+    start_time = time.time()
+    while True:
+        now = time.time()
+        time_str = get_current_time(now)
+        elapsed_str = format_time(now - start_time)
+        write(
+            prefix + encode(time_str) + mid + frames[frame_idx]
+            + body + encode(elapsed_str) + tail + sync_end
+        )
+        frame_idx = (frame_idx + 1) % nframes
+        # wait() повертає True одразу після set() — без хвоста до кінця інтервалу
+        if animation_stop_event.wait(interval):
+            break
+    # Очищаємо рядок спінера
+    write(clear)
+
+
+def loading_spinner(description: str):
+    # animation_stop_event скидає викликач ДО старту потоку: інакше set(),
+    # що встиг раніше за clear() у цьому потоці, загубився б
+    if not _is_tty:
+        _plain_progress_lines(description)
+        return
+    init_colorama()
+    stdout = sys.stdout
+    raw: BinaryIO | None = None if os.name == "nt" else getattr(stdout, "buffer", None)
+    if raw is None:
+        # Windows: текстовий шлях — обгортка colorama транслює ANSI-коди для
+        # консолей без VT-послідовностей. Маркери synchronized output не
+        # пишемо: colorama не розпізнає приватні CSI-режими і вивела б їх як текст
+        def write_text(data: str) -> None:
+            stdout.write(data)
+            stdout.flush()
+
+        _spin(description, str, write_text, "", "")
+        return
+
+    # POSIX: заздалегідь закодовані байти напряму у sys.stdout.buffer —
+    # без повторного кодування в TextIOWrapper
+    encoding = getattr(stdout, "encoding", None) or "utf-8"
+
+    def encode_bytes(text: str) -> bytes:
+        return text.encode(encoding, "replace")
+
+    def write_bytes(data: bytes) -> None:
+        raw.write(data)
+        raw.flush()
+
+    # Зливаємо текстовий буфер, щоб байти кадру не обігнали його вміст
+    stdout.flush()
+    _spin(description, encode_bytes, write_bytes, encode_bytes(_SYNC_BEGIN), encode_bytes(_SYNC_END))
 
 
 def countdown_timer(seconds: int):
-    message = ""
+    # Без TTY (daemon, перенаправлений вивід) зворотний відлік лише засмічує лог
+    # рядками з \r — одне очікування замість щосекундних записів
+    if not _is_tty:
+        if seconds > 0:
+            time.sleep(seconds)
+        return
+    init_colorama()
+    # Незмінні частини рядка збираються один раз, у циклі — лише час і залишок
+    prefix = _CLEAR_LINE + _ANSI_YELLOW + "["
+    middle = f"] {COUNTDOWN_ICON}  Очікування: залишилось "
     for remaining in range(seconds, 0, -1):
-        time_left = format_time(remaining)
-        message = f"{Fore.YELLOW}[{get_current_time()}] {COUNTDOWN_ICON}  Очікування: залишилось {time_left}..."
-        sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
-        sys.stdout.write(message)
+        sys.stdout.write(prefix + get_current_time() + middle + format_time(remaining) + "...")
         sys.stdout.flush()
         time.sleep(1)
     # Очищаємо рядок countdown
-    sys.stdout.write("\r" + " " * (len(message) + 2) + "\r")
+    sys.stdout.write(_CLEAR_LINE)
     sys.stdout.flush()
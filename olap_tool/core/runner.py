@@ -1,9 +1,13 @@
 from pathlib import Path
+import math
+import queue
 import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils import (
     print_header,
     print_info,
+    print_info_detail,
     print_warning,
     print_error,
     print_success,
@@ -15,22 +19,198 @@ from .utils import (
 )
 from .config import build_config
 from ..connection.connection import connect_to_olap, get_connection_string, AUTH_SSPI
-from ..data.queries import get_available_weeks, generate_year_week_pairs, run_dax_query
 from ..connection.auth import delete_credentials, get_current_windows_user, auth_username
 from .progress import TimeTracker, countdown_timer, init_display
 from .cli import parse_arguments, validate_arguments
-from . import periods
-from .compression import compress_files
-from .profiles import load_profile, print_profiles_list
-from .scheduler import start_scheduler, daemon_mode
-from ..sinks import ClickHouseSink, DuckDBSink, PostgreSQLSink
+from .period_resolver import resolve_year_week_pairs
+from .cache import load_available_weeks, save_available_weeks
 
+# Роздільник блоку стиснення в підсумку
+_SECTION_SEPARATOR = "─" * 40
 
-CURRENT_YEAR = datetime.datetime.now().year
-CURRENT_WEEK = datetime.datetime.now().isocalendar()[1]
 
+def _current_year_week():
+    """
+    Поточні ISO-рік і тиждень на момент виклику.
 
-def main(argv: list[str] | None = None) -> int:
+    Рахуються в main(), а не при імпорті: daemon/scheduler живуть днями і
+    модульна константа застаріла б після зміни тижня чи року. Один виклик
+    годинника для обох полів — рік і тиждень гарантовано з однієї ISO-дати.
+    """
+    year, week, _ = datetime.date.today().isocalendar()
+    return year, week
+
+
+def _print_progress_info(time_tracker) -> None:
+    # Форматуємо як однорядковий блок
+    lines = time_tracker.get_progress_info().strip().split("\n")
+    print_progress(" | ".join(line.strip() for line in lines))
+
+
+def _run_weeks_parallel(connection, year_week_pairs, year_dirs, config, connection_string, auth_details,
+                        max_concurrency, compressor=None):
+    """
+    Виконує тижні пулом потоків, кожен потік — на окремому з'єднанні з кубом.
+
+    Пауза query.timeout витримується для кожного з'єднання окремо (від
+    старту його попереднього запиту), тож одна OLAP-сесія навантажена
+    так само, як у послідовному режимі. TimeTracker оновлюється лише в
+    головному потоці, по мірі завершення тижнів, власним заміром тривалості
+    запиту кожного потоку; файл тижня одразу йде в compressor, тож ZIP
+    будується паралельно з рештою запитів. Помилка тижня скасовує ще не запущені тижні;
+    додаткові з'єднання закриваються в будь-якому разі. Повертає ([(шлях, розмір)]
+    у порядку тижнів, TimeTracker.stats()).
+    """
+    from ..data.queries import run_dax_query
+
+    time_tracker = TimeTracker(len(year_week_pairs), query_timeout=config.query.timeout, debug=config.display.debug)
+    query_timeout = config.query.timeout
+
+    extra_connections = []
+    try:
+        for _ in range(max_concurrency - 1):
+            extra = connect_to_olap(
+                config.secrets,
+                adomd_dll_path=config.paths.adomd_dll,
+                connection_string=connection_string,
+                auth_details=auth_details,
+            )
+            if not extra:
+                break
+            extra_connections.append(extra)
+        workers = 1 + len(extra_connections)
+        if workers < max_concurrency:
+            print_warning(f"Вдалося відкрити лише {workers} з {max_concurrency} з'єднань")
+
+        # (з'єднання, time.monotonic() старту його останнього запиту)
+        pool: queue.Queue = queue.Queue()
+        for conn in [connection, *extra_connections]:
+            pool.put((conn, None))
+
+        def run_week(year, week):
+            """(результат run_dax_query, тривалість запиту без паузи таймауту)."""
+            conn, last_started = pool.get()
+            if last_started is not None:
+                wait = query_timeout - (time.monotonic() - last_started)
+                if wait > 0:
+                    time.sleep(wait)
+            started = time.monotonic()
+            try:
+                result = run_dax_query(
+                    conn, f"{year}-{week:02d}",
+                    config.query, config.export, config.xlsx,
+                    config.csv, config.excel_header, config.paths,
+                    show_spinner=False, year_dir=year_dirs[year],
+                )
+                return result, time.monotonic() - started
+            finally:
+                pool.put((conn, started))
+
+        results = {}
+        print_info(f"Паралельна обробка: {workers} з'єднань, таймаут {query_timeout} с на з'єднання")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(run_week, year, week): i
+                for i, (year, week) in enumerate(year_week_pairs)
+            }
+            try:
+                for future in as_completed(futures):
+                    exported, duration = future.result()
+                    if exported:
+                        file_path, file_size_bytes = exported
+                        results[futures[future]] = (str(file_path), file_size_bytes)
+                        if compressor is not None:
+                            compressor.submit(str(file_path))
+                    time_tracker.update(processing_time=duration)
+                    _print_progress_info(time_tracker)
+            except BaseException:
+                # Тижні, що ще не стартували, скасовуються; вихід з with чекає
+                # лише на вже запущені запити
+                for pending in futures:
+                    pending.cancel()
+                raise
+    finally:
+        for conn in extra_connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    return [results[i] for i in sorted(results)], time_tracker.stats()
+
+
+def _run_weeks_sequential(connection, year_week_pairs, year_dirs, config, sinks, compressor):
+    """
+    Виконує тижні по черзі на одному з'єднанні з паузою query.timeout.
+
+    Пауза рахується від старту попереднього запиту, а не від його завершення:
+    час виконання запиту зараховується в інтервал. Повертає
+    ([(шлях, розмір)], TimeTracker.stats()).
+    """
+    from ..data.queries import run_dax_query
+
+    query_timeout = config.query.timeout
+    time_tracker = TimeTracker(len(year_week_pairs), query_timeout=query_timeout, debug=config.display.debug)
+    files_created: list[tuple[str, int]] = []
+    last_request_started = None
+    for i, (year, week) in enumerate(year_week_pairs):
+        if last_request_started is not None:
+            wait = math.ceil(query_timeout - (time.monotonic() - last_request_started))
+            if wait > 0:
+                print_info(f"Очікування {wait} секунд перед наступним запитом...")
+                time_tracker.start_waiting()
+                countdown_timer(wait)
+                time_tracker.end_waiting()
+
+        reporting_period = f"{year}-{week:02d}"
+        # Прогрес-інфо для 2+ тижня
+        if i > 0:
+            _print_progress_info(time_tracker)
+
+        print_header(f"Тиждень {reporting_period}  ({i+1}/{len(year_week_pairs)})")
+        last_request_started = time.monotonic()
+        exported = run_dax_query(
+            connection, reporting_period,
+            config.query, config.export, config.xlsx,
+            config.csv, config.excel_header, config.paths,
+            sinks=sinks, year_dir=year_dirs[year],
+        )
+        if exported:
+            file_path, file_size_bytes = exported
+            files_created.append((str(file_path), file_size_bytes))
+            if compressor is not None:
+                compressor.submit(str(file_path))
+        time_tracker.update()
+    return files_created, time_tracker.stats()
+
+
+def _run_single_week(connection, year_week, config, sinks, year_dirs):
+    """Експорт одного тижня без налаштування циклу; повертає [(шлях, розмір)]."""
+    from ..data.queries import run_dax_query
+
+    year, week = year_week
+    reporting_period = f"{year}-{week:02d}"
+    print_header(f"Тиждень {reporting_period}  (1/1)")
+    exported = run_dax_query(
+        connection, reporting_period,
+        config.query, config.export, config.xlsx,
+        config.csv, config.excel_header, config.paths,
+        sinks=sinks, year_dir=year_dirs[year],
+    )
+    if not exported:
+        return []
+    file_path, file_size_bytes = exported
+    return [(str(file_path), file_size_bytes)]
+
+
+def main(argv: list[str] | None = None, connect=None) -> int:
+    """
+    Точка входу експорту.
+
+    connect — функція (secrets, adomd_dll_path) -> (з'єднання, (connection_string,
+    auth_details)) для вже побудованого конфігу: планувальник передає свій пул
+    і перевикористовує одне з'єднання між запусками, яке тут не закривається.
+    (None, None) від неї — main() відкриває власне з'єднання.
+    """
     # Парсинг CLI аргументів (argv[1:] якщо передано, інакше sys.argv)
     cli_argv = argv[1:] if argv is not None else None
     args = parse_arguments(cli_argv)
@@ -51,8 +231,13 @@ def main(argv: list[str] | None = None) -> int:
             print_error("Не вдалося видалити збережені облікові дані")
         return 0
 
+    # Підсистеми профілів, планувальника, стиснення та data.queries (pandas)
+    # імпортуються лише в гілках, яким вони потрібні — --help, --list-profiles
+    # і --clear-credentials не платять за їх імпорт
+
     # Обробка --list-profiles
     if args.list_profiles:
+        from .profiles import print_profiles_list
         print_profiles_list()
         return 0
 
@@ -61,6 +246,7 @@ def main(argv: list[str] | None = None) -> int:
         if not args.profile:
             print_error("Режим daemon вимагає вказання профілю (--profile)")
             return 1
+        from .scheduler import daemon_mode
         return daemon_mode([args.profile])
 
     # Обробка планувальника
@@ -68,11 +254,13 @@ def main(argv: list[str] | None = None) -> int:
         if not args.profile:
             print_error("Планувальник вимагає вказання профілю (--profile)")
             return 1
+        from .scheduler import start_scheduler
         return start_scheduler(args.profile, args.schedule)
 
     # Завантаження профілю
     profile_config = {}
     if args.profile:
+        from .profiles import load_profile
         profile_config = load_profile(args.profile)
         if not profile_config:
             return 1
@@ -89,120 +277,77 @@ def main(argv: list[str] | None = None) -> int:
         progress_update_interval_ms=config.display.progress_update_interval_ms,
     )
 
+    from ..data.queries import get_available_weeks
+    from ..sinks import ClickHouseSink, DuckDBSink, PostgreSQLSink
+
     start_period = config.query.year_week_start
     end_period = config.query.year_week_end
 
-    connection_string, auth_details = get_connection_string(config.secrets)
-    connection = connect_to_olap(
-        config.secrets,
-        adomd_dll_path=config.paths.adomd_dll,
-        connection_string=connection_string,
-        auth_details=auth_details,
+    connection, connection_info = (
+        connect(config.secrets, config.paths.adomd_dll) if connect is not None else (None, None)
     )
+    if connection_info is not None:
+        connection_string, auth_details = connection_info
+    else:
+        connection_string, auth_details = get_connection_string(config.secrets)
+    owns_connection = connection is None
+    if owns_connection:
+        connection = connect_to_olap(
+            config.secrets,
+            adomd_dll_path=config.paths.adomd_dll,
+            connection_string=connection_string,
+            auth_details=auth_details,
+        )
     if not connection:
         print_error("Не вдалося підключитися до OLAP. Програма завершує роботу.")
         return 1
 
     sinks: list = []
     cursor = None
+    compressor = None
     try:
-        available_weeks = get_available_weeks(connection)
-
-        # Визначення періоду з урахуванням CLI аргументів та профілю
-        year_week_pairs = None
-
-        # Пріоритет 1: Автоматичні періоди з CLI
-        if args.last_weeks:
-            calculated_weeks = periods.calculate_last_weeks(args.last_weeks)
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.current_month:
-            calculated_weeks = periods.calculate_current_month()
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.last_month:
-            calculated_weeks = periods.calculate_last_month()
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.current_quarter:
-            calculated_weeks = periods.calculate_current_quarter()
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.last_quarter:
-            calculated_weeks = periods.calculate_last_quarter()
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.year_to_date:
-            calculated_weeks = periods.calculate_year_to_date()
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        elif args.rolling_weeks:
-            calculated_weeks = periods.calculate_rolling_weeks(args.rolling_weeks)
-            year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-        # Пріоритет 2: Ручні періоди з CLI
-        elif args.period:
-            try:
-                start_period, end_period = args.period.split(":")
-                year_week_pairs = generate_year_week_pairs(start_period, end_period, available_weeks)
-            except ValueError:
-                print_error("Невірний формат --period. Використовуйте формат YYYY-WW:YYYY-WW")
-                return 1
-        elif args.start and args.end:
-            year_week_pairs = generate_year_week_pairs(args.start, args.end, available_weeks)
-        # Пріоритет 3: Періоди з профілю
-        elif profile_config and "period" in profile_config:
-            period_cfg = profile_config["period"]
-            period_type = period_cfg.get("type")
-
-            if period_type == "auto":
-                auto_type = period_cfg.get("auto_type")
-                auto_value = period_cfg.get("auto_value")
-
-                print_info(f"Використання періоду з профілю: {auto_type}")
-
-                if auto_type == "last-weeks" and auto_value:
-                    calculated_weeks = periods.calculate_last_weeks(auto_value)
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "current-month":
-                    calculated_weeks = periods.calculate_current_month()
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "last-month":
-                    calculated_weeks = periods.calculate_last_month()
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "current-quarter":
-                    calculated_weeks = periods.calculate_current_quarter()
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "last-quarter":
-                    calculated_weeks = periods.calculate_last_quarter()
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "year-to-date":
-                    calculated_weeks = periods.calculate_year_to_date()
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-                elif auto_type == "rolling-weeks" and auto_value:
-                    calculated_weeks = periods.calculate_rolling_weeks(auto_value)
-                    year_week_pairs = periods.filter_by_available_weeks(calculated_weeks, available_weeks)
-
-            elif period_type == "manual":
-                manual_start = period_cfg.get("start")
-                manual_end = period_cfg.get("end")
-                if manual_start and manual_end:
-                    year_week_pairs = generate_year_week_pairs(manual_start, manual_end, available_weeks)
-
-        # Пріоритет 4: Періоди з config
-        elif start_period and end_period:
-            year_week_pairs = generate_year_week_pairs(
-                start_period, end_period, available_weeks
+        available_weeks = load_available_weeks(
+            config.paths.cache_dir, config.secrets.server, config.secrets.database,
+            config.query.available_weeks_cache_ttl,
+        )
+        if available_weeks is not None:
+            print_info(f"Доступні тижні взято з кешу ({len(available_weeks)} тижнів)")
+        else:
+            available_weeks = get_available_weeks(connection)
+            if available_weeks and config.query.available_weeks_cache_ttl > 0:
+                save_available_weeks(
+                    config.paths.cache_dir, config.secrets.server, config.secrets.database,
+                    available_weeks,
+                )
+
+        # Визначення періоду з урахуванням CLI аргументів, профілю та config
+        try:
+            # Для блоку налаштувань resolver повертає період гілки, що спрацювала
+            year_week_pairs, start_period, end_period = resolve_year_week_pairs(
+                args, profile_config, start_period, end_period, available_weeks
             )
+        except ValueError:
+            print_error("Невірний формат --period. Використовуйте формат YYYY-WW:YYYY-WW")
+            return 1
 
         # Fallback: поточний тиждень
         if not year_week_pairs:
             print_warning(
                 "Не вдалося згенерувати список періодів. Використовується поточний тиждень."
             )
-            year_num = CURRENT_YEAR
-            week_nums = [CURRENT_WEEK]
-            year_week_pairs = [(year_num, week) for week in week_nums]
+            year_week_pairs = [_current_year_week()]
+        else:
+            # Один раз впорядковуємо і прибираємо дублікати: назва ZIP бере [0]/[-1]
+            year_week_pairs = sorted(set(year_week_pairs))
 
         filter_fg1_name = config.query.filter_fg1_name
 
         result_dir = Path(config.paths.result_dir)
         ensure_dir(result_dir)
-        for year, _ in set((year, 0) for year, _ in year_week_pairs):
-            ensure_dir(result_dir / str(year))
+        # Шлях кожного року будується один раз і передається в run_dax_query та для ZIP
+        year_dirs = {year: result_dir / str(year) for year in dict.fromkeys(year for year, _ in year_week_pairs)}
+        for year_dir in year_dirs.values():
+            ensure_dir(year_dir)
 
         query_timeout = config.query.timeout
 
@@ -238,7 +383,6 @@ def main(argv: list[str] | None = None) -> int:
             details["PostgreSQL"] = f"{config.postgresql.host}:{config.postgresql.port}"
             details["PG Table"] = f"{config.postgresql.schema}.{config.postgresql.table}"
 
-        from .utils import print_info_detail
         print_info_detail("Налаштування:", details)
 
         # Побудова списку активних analytics sinks
@@ -249,79 +393,81 @@ def main(argv: list[str] | None = None) -> int:
         if config.postgresql.enabled or export_format in ("PG", "POSTGRESQL"):
             sinks.append(PostgreSQLSink(config.postgresql))
 
+        # Sinks не потокобезпечні (setup/delete_period на першому chunk'у) —
+        # з ними лише послідовний режим
+        max_concurrency = min(max(1, config.query.max_concurrency), len(year_week_pairs))
+        if max_concurrency > 1 and sinks:
+            print_warning("Паралельні запити не підтримуються разом з sinks — виконання послідовне")
+            max_concurrency = 1
+
+        # Для кількох тижнів ZIP наповнюється у фоні, поки виконуються наступні запити
+        if config.export.compress == "zip" and len(year_week_pairs) > 1:
+            from .compression import BackgroundCompressor
+            first_year, first_week = year_week_pairs[0]
+            last_year, last_week = year_week_pairs[-1]
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            zip_name = f"{first_year}-{first_week:02d}_to_{last_year}-{last_week:02d}_export_{timestamp}.zip"
+            compressor = BackgroundCompressor(
+                str(year_dirs[first_year] / zip_name), keep_originals=True,
+                compress_level=config.export.compress_level,
+            )
+
         start_time = time.time()
-        files_created: list[str] = []
+        # (шлях, розмір у байтах) — розмір повертає run_dax_query
+        files_created: list[tuple[str, int]] = []
         print_info(f"Запуск обробки для {len(year_week_pairs)} тижнів...")
-        time_tracker = TimeTracker(len(year_week_pairs), query_timeout=query_timeout, debug=config.display.debug)
-        for i, (year, week) in enumerate(year_week_pairs):
-            if i > 0:
-                print_info(f"Очікування {query_timeout} секунд перед наступним запитом...")
-                time_tracker.start_waiting()
-                countdown_timer(query_timeout)
-                time_tracker.end_waiting()
-
-            reporting_period = f"{year}-{week:02d}"
-            # Прогрес-інфо для 2+ тижня
-            if i > 0:
-                progress_info = time_tracker.get_progress_info()
-                # Форматуємо як однорядковий блок
-                lines = progress_info.strip().split("\n")
-                print_progress(" | ".join(line.strip() for line in lines))
-
-            print_header(f"Тиждень {reporting_period}  ({i+1}/{len(year_week_pairs)})")
-            file_path = run_dax_query(
-                connection, reporting_period,
-                config.query, config.export, config.xlsx,
-                config.csv, config.excel_header, config.paths,
-                sinks=sinks,
+        # (кількість, середній, мін, макс) часу на тиждень; None — один тиждень
+        time_stats = None
+        if len(year_week_pairs) == 1:
+            # Найчастіший випадок (щоденний експорт одного тижня): без TimeTracker,
+            # пауз і прогресу — лише один запит
+            files_created = _run_single_week(connection, year_week_pairs[0], config, sinks, year_dirs)
+        elif max_concurrency > 1:
+            files_created, time_stats = _run_weeks_parallel(
+                connection, year_week_pairs, year_dirs, config, connection_string, auth_details,
+                max_concurrency, compressor,
+            )
+        else:
+            files_created, time_stats = _run_weeks_sequential(
+                connection, year_week_pairs, year_dirs, config, sinks, compressor,
             )
-            if file_path:
-                files_created.append(str(file_path))
-            time_tracker.update()
 
         # Стиснення файлів якщо вказано compress=zip
         zip_file_path = None
         if config.export.compress == "zip" and files_created:
-            print_info(f"{'─' * 40}")
+            print_info(_SECTION_SEPARATOR)
             print_info("Стиснення файлів у ZIP архів...")
-            if len(year_week_pairs) == 1:
-                zip_file_path = compress_files(files_created, keep_originals=True)
+            if compressor is not None:
+                zip_file_path = compressor.finish()
             else:
-                first_year, first_week = year_week_pairs[0]
-                last_year, last_week = year_week_pairs[-1]
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                zip_name = f"{first_year}-{first_week:02d}_to_{last_year}-{last_week:02d}_export_{timestamp}.zip"
-                zip_output_path = result_dir / str(first_year) / zip_name
-                zip_file_path = compress_files(files_created, output_path=str(zip_output_path), keep_originals=True)
+                from .compression import compress_files
+                file_paths = [file_path for file_path, _ in files_created]
+                zip_file_path = compress_files(
+                    file_paths, keep_originals=True, compress_level=config.export.compress_level,
+                )
 
         processing_time = time.time() - start_time
         print_header("ПІДСУМОК ОБРОБКИ")
-        if len(year_week_pairs) > 1:
-            avg_time_per_week = (
-                sum(time_tracker.elapsed_times) / len(time_tracker.elapsed_times)
-                if time_tracker.elapsed_times
-                else 0
-            )
+        if time_stats is not None:
+            _, avg_time, min_time, max_time = time_stats
             time_details = {
                 "Загальний час": format_time(processing_time),
-                "Середній час": format_time(avg_time_per_week),
+                "Середній час": format_time(avg_time),
+                "Мінімальний час": format_time(min_time),
+                "Максимальний час": format_time(max_time),
             }
-            if time_tracker.elapsed_times:
-                min_time = min(time_tracker.elapsed_times)
-                max_time = max(time_tracker.elapsed_times)
-                time_details["Мінімальний час"] = format_time(min_time)
-                time_details["Максимальний час"] = format_time(max_time)
             print_info_detail("Деталі часу виконання:", time_details)
         else:
             print_success(f"Обробку завершено за {format_time(processing_time)}")
 
-        print_info(f"Створено файлів: {len(files_created)}")
         if files_created:
-            for i, file_path in enumerate(files_created, 1):
-                path = Path(file_path)
-                file_size = format_file_size(path.stat().st_size)
-                print_info(f"{i}. {file_path} ({file_size})")
+            # Один вивід таблицею замість окремого print_info на кожен файл
+            print_info_detail(f"Створено файлів: {len(files_created)}", {
+                str(i): f"{file_path} ({format_file_size(file_size_bytes)})"
+                for i, (file_path, file_size_bytes) in enumerate(files_created, 1)
+            })
         else:
+            print_info(f"Створено файлів: {len(files_created)}")
             print_warning("Не було створено жодного файлу")
 
         if zip_file_path:
@@ -329,13 +475,15 @@ def main(argv: list[str] | None = None) -> int:
             print_success(f"ZIP архів: {zip_file_path} ({zip_size})")
 
     finally:
+        if compressor is not None:
+            compressor.close()
         for sink in sinks:
             try:
                 sink.close()
             except Exception:
                 pass
-        # Bug fix: з'єднання завжди закривається
-        if connection:
+        # Bug fix: з'єднання завжди закривається (крім переданого ззовні)
+        if connection and owns_connection:
             try:
                 connection.close()
                 print_info("Підключення до OLAP сервера закрито")
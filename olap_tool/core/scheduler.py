@@ -5,11 +5,15 @@
 Підтримує простий формат розкладу та cron вирази.
 """
 
-import time
+import atexit
+import os
+import queue
+import re
 import signal
+import threading
 import datetime
 from pathlib import Path
-from typing import Optional, List, Any, TYPE_CHECKING
+from typing import Optional, List, Any, Dict, TYPE_CHECKING
 
 try:
     import schedule
@@ -25,17 +29,103 @@ from .utils import print_info, print_warning, print_error, print_success
 from .profiles import load_profile
 
 
-# Глобальний прапор для graceful shutdown
-_shutdown_requested = False
+# Подія graceful shutdown: сигнал будить цикл одразу, без очікування тайм-ауту
+_shutdown_event = threading.Event()
+
+# Верхня межа сну між перевірками розкладу (сек) — щоб цикл не "проспав"
+# зміну системного часу і лишався чутливим до Ctrl+C на Windows
+_MAX_IDLE_SLEEP = 60.0
+
+# Пул з'єднань з OLAP між запусками планувальника:
+# (сервер, база, метод автентифікації, користувач) ->
+# (відкрите з'єднання, (connection_string, auth_details)). Облікові дані
+# розшифровуються один раз на з'єднання, а не на кожен запуск
+_connection_cache: Dict[tuple, tuple] = {}
+
+
+class _DaemonLog:
+    """
+    Запис лог-файлу daemon у фоновому потоці.
+
+    Файл відкривається один раз; цикл планувальника лише кладе запис у чергу
+    і не чекає на диск. Записи скидаються на диск щойно черга спорожніла.
+    """
+
+    _STOP = object()
+    # Скільки чекати на дописування черги при зупинці daemon (сек)
+    _CLOSE_TIMEOUT = 5.0
+
+    def __init__(self, path: Path, maxsize: int = 1000):
+        self.path = path
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._drain, name="daemon-log", daemon=True)
+        self._thread.start()
+
+    def error(self, message: str) -> None:
+        try:
+            self._queue.put_nowait((datetime.datetime.now(), "ERROR", message))
+        except queue.Full:
+            # Під час шторму помилок краще втратити запис, ніж зупинити цикл
+            pass
+
+    def close(self) -> None:
+        """Дописує чергу і закриває файл; не блокує зупинку, якщо потік запису вже впав."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(self._STOP, timeout=self._CLOSE_TIMEOUT)
+        except queue.Full:
+            print_warning(f"Лог daemon не дописано: черга запису переповнена ({self.path})")
+            return
+        self._thread.join(timeout=self._CLOSE_TIMEOUT)
+
+    def _drain(self) -> None:
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                while True:
+                    record = self._queue.get()
+                    if record is self._STOP:
+                        break
+                    timestamp, level, message = record
+                    f.write(f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {level} {message}\n")
+                    if self._queue.empty():
+                        f.flush()
+        except OSError as e:
+            # Потік запису завершується; error() далі лише відкидає записи (черга обмежена)
+            print_error(f"Не вдалося записати лог daemon у {self.path}: {e}")
 
 
 def signal_handler(signum, frame):
     """
     Обробник сигналу для graceful shutdown.
     """
-    global _shutdown_requested
     print_warning("Отримано сигнал завершення. Зупинка планувальника...")
-    _shutdown_requested = True
+    _shutdown_event.set()
+
+
+def _wait_for_next_job(seconds: float | None = None) -> None:
+    """
+    Спить до наступної задачі (schedule.idle_seconds), але не довше _MAX_IDLE_SLEEP.
+
+    Замість щосекундного опитування — одне очікування на подію завершення.
+    """
+    if seconds is None:
+        # Викликається лише з циклів start_scheduler/daemon_mode, які вже
+        # перевірили SCHEDULE_AVAILABLE
+        assert schedule is not None
+        idle = schedule.idle_seconds()
+        seconds = _MAX_IDLE_SLEEP if idle is None else min(max(idle, 0.0), _MAX_IDLE_SLEEP)
+    if seconds > 0:
+        _shutdown_event.wait(seconds)
+
+
+# Розклад компілюється один раз. Окремі слова замість пошуку підрядків:
+# "saturday" містить "at" і ламав розбір через split("at")
+_AT_SCHEDULE_RE = re.compile(r"^every\s+(?:(\d+)\s+days?|(\w+))\s+at\s+(\S+)$")
+_INTERVAL_SCHEDULE_RE = re.compile(r"^every\s+(\d+)\s+(week|day|hour)s?$")
+_SCHEDULE_DAYS = frozenset(
+    ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "day")
+)
 
 
 def parse_simple_schedule(schedule_spec: str) -> Optional[Any]:
@@ -55,65 +145,122 @@ def parse_simple_schedule(schedule_spec: str) -> Optional[Any]:
     spec_lower = schedule_spec.lower().strip()
 
     try:
-        # Формат: "every monday at 09:00"
-        if "every" in spec_lower and "at" in spec_lower:
-            parts = spec_lower.split("at")
-            day_part = parts[0].strip().replace("every", "").strip()
-            time_part = parts[1].strip()
-
-            # Визначення дня тижня або періоду
-            if "monday" in day_part:
-                job = schedule.every().monday.at(time_part)
-            elif "tuesday" in day_part:
-                job = schedule.every().tuesday.at(time_part)
-            elif "wednesday" in day_part:
-                job = schedule.every().wednesday.at(time_part)
-            elif "thursday" in day_part:
-                job = schedule.every().thursday.at(time_part)
-            elif "friday" in day_part:
-                job = schedule.every().friday.at(time_part)
-            elif "saturday" in day_part:
-                job = schedule.every().saturday.at(time_part)
-            elif "sunday" in day_part:
-                job = schedule.every().sunday.at(time_part)
-            elif "day" in day_part:
-                job = schedule.every().day.at(time_part)
-            else:
+        # Формат: "every monday at 09:00", "every day at 18:00", "every 2 days at 06:00"
+        match = _AT_SCHEDULE_RE.match(spec_lower)
+        if match:
+            days_interval, day_part, time_part = match.groups()
+            if days_interval:
+                return schedule.every(int(days_interval)).days.at(time_part)
+            if day_part not in _SCHEDULE_DAYS:
                 print_error(f"Невідомий день тижня: {day_part}")
                 return None
+            return getattr(schedule.every(), day_part).at(time_part)
+
+        # Формат: "every 1 week", "every 2 days", "every 6 hours"
+        match = _INTERVAL_SCHEDULE_RE.match(spec_lower)
+        if match:
+            number, unit = match.groups()
+            return getattr(schedule.every(int(number)), f"{unit}s")
+
+        print_error(f"Невірний формат розкладу: {schedule_spec}")
+        print_info("Приклади правильних форматів:")
+        print_info("  - every monday at 09:00")
+        print_info("  - every day at 18:00")
+        print_info("  - every 1 week")
+        return None
+
+    except Exception as e:
+        print_error(f"Помилка парсингу розкладу '{schedule_spec}': {e}")
+        return None
 
-            return job
 
-        # Формат: "every 1 week"
-        elif "every" in spec_lower and ("week" in spec_lower or "day" in spec_lower or "hour" in spec_lower):
-            parts = spec_lower.split()
-            if len(parts) >= 3:
-                number = int(parts[1])
-                unit = parts[2]
+def _pool_key(secrets) -> tuple:
+    """
+    Ключ пулу: (сервер, база, метод автентифікації, користувач).
 
-                if "week" in unit:
-                    job = schedule.every(number).weeks
-                elif "day" in unit:
-                    job = schedule.every(number).days
-                elif "hour" in unit:
-                    job = schedule.every(number).hours
-                else:
-                    print_error(f"Невідома одиниця часу: {unit}")
-                    return None
+    Для SSPI користувач — поточний обліковий запис Windows. Для LOGIN логін
+    зберігається лише зашифрованим у файлі облікових даних, тож користувача
+    ідентифікують домен, шлях і mtime цього файлу: повторний ввід чи ротація
+    облікових даних дають новий ключ замість чужої сесії з пулу.
+    """
+    from ..connection.auth import get_current_windows_user
+    from ..connection.connection import AUTH_LOGIN
 
-                return job
+    auth_method = secrets.auth_method.upper()
+    if auth_method == AUTH_LOGIN:
+        credentials_file = os.path.abspath(secrets.credentials_file)
+        try:
+            mtime_ns: Optional[int] = os.stat(credentials_file).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        user: Any = (secrets.domain, credentials_file, mtime_ns)
+    else:
+        user = get_current_windows_user()
+    return (secrets.server, secrets.database, auth_method, user)
 
-        else:
-            print_error(f"Невірний формат розкладу: {schedule_spec}")
-            print_info("Приклади правильних форматів:")
-            print_info("  - every monday at 09:00")
-            print_info("  - every day at 18:00")
-            print_info("  - every 1 week")
-            return None
 
-    except Exception as e:
-        print_error(f"Помилка парсингу розкладу '{schedule_spec}': {e}")
-        return None
+def get_or_connect(secrets, adomd_dll_path: str = ""):
+    """
+    Повертає (з'єднання, (connection_string, auth_details)) з пулу для цих секретів.
+
+    Перед кожним запуском з'єднання перевіряється тривіальним запитом:
+    сервер міг закрити сесію між запусками. Рядок підключення живе разом із
+    з'єднанням: при втраті сесії чи зміні облікових даних (новий ключ пулу)
+    він будується заново, а не береться застарілим. (None, None) — runner.main()
+    відкриє власне з'єднання і виведе помилку, якщо не вдасться.
+    """
+    from ..connection.connection import connect_to_olap, get_connection_string, ping_connection
+
+    key = _pool_key(secrets)
+    _drop_stale_connections(key)
+    entry = _connection_cache.get(key)
+    if entry is not None:
+        if ping_connection(entry[0]):
+            return entry
+        print_warning("З'єднання з OLAP втрачено, підключаємося заново")
+        _close_connection(_connection_cache.pop(key)[0])
+
+    connection_info = get_connection_string(secrets)
+    connection_string, auth_details = connection_info
+    if connection_string is None:
+        return None, None
+    connection = connect_to_olap(
+        secrets,
+        adomd_dll_path=adomd_dll_path,
+        connection_string=connection_string,
+        auth_details=auth_details,
+    )
+    if not connection:
+        return None, None
+    # connect_to_olap перезаписує файл облікових даних — ключ береться після нього
+    key = _pool_key(secrets)
+    _drop_stale_connections(key)
+    _connection_cache[key] = (connection, connection_info)
+    return connection, connection_info
+
+
+def _drop_stale_connections(key: tuple) -> None:
+    """Закриває з'єднання до того ж сервера й бази з іншими обліковими даними."""
+    for cached_key in list(_connection_cache):
+        if cached_key[:3] == key[:3] and cached_key != key:
+            _close_connection(_connection_cache.pop(cached_key)[0])
+
+
+def _close_connection(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def close_pooled_connections() -> None:
+    """Закриває всі з'єднання пулу (зупинка планувальника або вихід з процесу)."""
+    while _connection_cache:
+        _close_connection(_connection_cache.popitem()[1][0])
+
+
+# Пул закривається і тоді, коли цикл планувальника перервано винятком
+atexit.register(close_pooled_connections)
 
 
 def run_scheduled_task(profile_name: str) -> None:
@@ -128,8 +275,9 @@ def run_scheduled_task(profile_name: str) -> None:
     print_info(f"Запуск задачі: {profile_name} о {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     try:
-        # Передаємо argv напряму — без мутації sys.argv
-        return_code = main(argv=['olap.py', '--profile', profile_name])
+        # Передаємо argv напряму — без мутації sys.argv; з'єднання main() бере
+        # з пулу для секретів конфігу, який вона вже побудувала
+        return_code = main(argv=['olap.py', '--profile', profile_name], connect=get_or_connect)
 
         if return_code == 0:
             print_success(f"Задача '{profile_name}' виконана успішно")
@@ -180,18 +328,18 @@ def start_scheduler(profile_name: str, schedule_spec: str) -> int:
             print_info(f"Наступний запуск: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
 
     # Основний цикл планувальника
-    global _shutdown_requested
-    _shutdown_requested = False
-    while not _shutdown_requested:
+    _shutdown_event.clear()
+    while not _shutdown_event.is_set():
         try:
             schedule.run_pending()
-            time.sleep(1)
+            _wait_for_next_job()
         except KeyboardInterrupt:
             break
         except Exception as e:
             print_error(f"Помилка в циклі планувальника: {e}")
-            time.sleep(5)
+            _wait_for_next_job(5)
 
+    close_pooled_connections()
     print_info("Планувальник зупинено")
     return 0
 
@@ -284,21 +432,22 @@ def daemon_mode(profiles: List[str]) -> int:
     print_success("Daemon режим активний. Натисніть Ctrl+C для зупинки")
 
     # Основний цикл
-    global _shutdown_requested
-    _shutdown_requested = False
-    while not _shutdown_requested:
-        try:
-            schedule.run_pending()
-            time.sleep(1)
-        except KeyboardInterrupt:
-            break
-        except Exception as e:
-            print_error(f"Помилка в daemon циклі: {e}")
-            # Логування помилки
-            with open(log_filename, 'a', encoding='utf-8') as f:
-                timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"[{timestamp}] ERROR {e}\n")
-            time.sleep(5)
-
+    daemon_log = _DaemonLog(log_filename)
+    _shutdown_event.clear()
+    try:
+        while not _shutdown_event.is_set():
+            try:
+                schedule.run_pending()
+                _wait_for_next_job()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print_error(f"Помилка в daemon циклі: {e}")
+                daemon_log.error(str(e))
+                _wait_for_next_job(5)
+    finally:
+        daemon_log.close()
+
+    close_pooled_connections()
     print_info("Daemon режим зупинено")
     return 0
@@ -1,23 +1,41 @@
 import datetime
+import math
+import re
+import time
 
 from rich.console import Console
 from rich.table import Table
 
-# colorama потрібен для progress.py (spinner/countdown з \r overwrite)
-from colorama import init as _colorama_init
-_colorama_init(autoreset=True)
-
 _console = Console(highlight=False)
 
 # Набір символів для логів — налаштовується через init_utils()
 _ascii_logs = False
 
-ICON_INFO = "ℹ️"
-ICON_WARN = "⚠️"
-ICON_ERR = "❌"
-ICON_OK = "✅"
-ICON_PROGRESS = "🔄"
-ICON_STOP = "🛑"
+# (INFO, WARN, ERR, OK, PROGRESS, STOP)
+_UNICODE_ICONS = ("ℹ️", "⚠️", "❌", "✅", "🔄", "🛑")
+_ASCII_ICONS = ("i", "!", "x", "+", "*", "X")
+
+ICON_INFO, ICON_WARN, ICON_ERR, ICON_OK, ICON_PROGRESS, ICON_STOP = _UNICODE_ICONS
+
+
+_colorama_ready = False
+
+
+def init_colorama() -> None:
+    """
+    Вмикає обгортку stdout від colorama (autoreset) — один раз за процес.
+
+    Потрібна лише для виводу з сирими ANSI-кодами (spinner/countdown з \r
+    overwrite, input-підказки); print_* ідуть через rich і без неї. Тому
+    обгортка встановлюється не при імпорті модуля, а перед першим таким виводом.
+    """
+    global _colorama_ready
+    if _colorama_ready:
+        return
+    from colorama import init as _colorama_init
+
+    _colorama_init(autoreset=True)
+    _colorama_ready = True
 
 
 def init_utils(ascii_logs: bool = False) -> None:
@@ -25,145 +43,230 @@ def init_utils(ascii_logs: bool = False) -> None:
     global _ascii_logs
     global ICON_INFO, ICON_WARN, ICON_ERR, ICON_OK, ICON_PROGRESS, ICON_STOP
     _ascii_logs = ascii_logs
-    if _ascii_logs:
-        ICON_INFO = "i"
-        ICON_WARN = "!"
-        ICON_ERR = "x"
-        ICON_OK = "+"
-        ICON_PROGRESS = "*"
-        ICON_STOP = "X"
-    else:
-        ICON_INFO = "ℹ️"
-        ICON_WARN = "⚠️"
-        ICON_ERR = "❌"
-        ICON_OK = "✅"
-        ICON_PROGRESS = "🔄"
-        ICON_STOP = "🛑"
+    ICON_INFO, ICON_WARN, ICON_ERR, ICON_OK, ICON_PROGRESS, ICON_STOP = (
+        _ASCII_ICONS if _ascii_logs else _UNICODE_ICONS
+    )
+    _build_log_templates()
+
+
+def _build_log_templates() -> None:
+    """
+    Збирає шаблони рядків логу з поточними іконками.
+
+    Колір та іконка не змінюються між викликами — print_* лише підставляють
+    час і текст у готовий шаблон.
+    """
+    global _INFO_TMPL, _WARN_TMPL, _ERR_TMPL, _OK_TMPL, _PROGRESS_TMPL, _STOP_TMPL
+    _INFO_TMPL = f"[dim]\\[%s][/dim] [green]{ICON_INFO}  %s[/green]"
+    _WARN_TMPL = f"[dim]\\[%s][/dim] [yellow]{ICON_WARN}  %s[/yellow]"
+    _ERR_TMPL = f"[dim]\\[%s][/dim] [red]{ICON_ERR} %s[/red]"
+    _OK_TMPL = f"[dim]\\[%s][/dim] [green]{ICON_OK} %s[/green]"
+    _PROGRESS_TMPL = f"[dim]\\[%s][/dim] [blue]{ICON_PROGRESS} %s[/blue]"
+    _STOP_TMPL = f"[dim]\\[%s][/dim] [red]{ICON_STOP} %s[/red]"
+
+
+_build_log_templates()
 
 
 def ensure_dir(pathlike, verbose: bool = False):
     from pathlib import Path
 
     path = Path(pathlike)
-    created = not path.exists()
-    path.mkdir(parents=True, exist_ok=True)
+    # Один mkdir замість exists() + mkdir(). Будь-який OSError для наявної
+    # директорії — не помилка, як і з exist_ok=True: на корені диска чи
+    # read-only томі mkdir дає PermissionError, а не FileExistsError
+    try:
+        path.mkdir(parents=True)
+        created = True
+    except OSError:
+        if not path.is_dir():
+            raise
+        created = False
     if verbose or created:
         print_info(f"Директорія '{path}' створена")
     return path
 
 
-def get_current_time():
-    return datetime.datetime.now().strftime("%H:%M:%S")
+# (секунда epoch, "HH:MM:SS") — кортеж замінюється цілком, тому читання
+# з потоку спінера і головного потоку не бачить половинчастого стану
+_time_str_cache: tuple = (-1, "")
+
+
+def get_current_time(timestamp: float | None = None):
+    """
+    Поточний час HH:MM:SS; timestamp дозволяє перевикористати вже знятий time.time().
+
+    Рядок форматується не частіше разу на секунду — спінер питає його ~10 разів/с.
+    """
+    global _time_str_cache
+    second = int(time.time() if timestamp is None else timestamp)
+    cached_second, cached_str = _time_str_cache
+    if second == cached_second:
+        return cached_str
+    time_str = time.strftime("%H:%M:%S", time.localtime(second))
+    _time_str_cache = (second, time_str)
+    return time_str
 
 
 def print_header(text: str):
-    _console.print()
-    _console.rule(f"[bold]{text}[/bold]", style="cyan")
-    _console.print()
+    # with _console: rich накопичує вивід і пише його одним write() на виході з блоку
+    with _console:
+        _console.print()
+        _console.rule(f"[bold]{text}[/bold]", style="cyan")
+        _console.print()
+
+
+# Рядок блоку деталей: мітка вирівнюється по найдовшій, між колонками два пробіли
+_DETAIL_ROW_TMPL = "[dim cyan]{label:<{width}}[/dim cyan]  [white]{value}[/white]"
+
+# Ключі деталей, значення яких маскуються (без проміжного key.lower())
+_PASSWORD_KEY_RE = re.compile(r"password|пароль", re.IGNORECASE)
 
 
 def print_info_detail(text: str, details: dict | None = None):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [green]{ICON_INFO}  {text}[/green]"
-    )
+    _console.print(_INFO_TMPL % (get_current_time(), text))
     if details:
-        table = Table(
-            show_header=False, box=None, padding=(0, 1), pad_edge=False,
-        )
-        table.add_column(style="dim cyan", no_wrap=True, min_width=3)
-        table.add_column(style="white")
+        rows = []
         for key, value in details.items():
-            if "password" in key.lower() or "пароль" in key.lower():
+            if _PASSWORD_KEY_RE.search(key):
                 value = "********"
-            table.add_row(f"   {key}:", str(value))
-        _console.print(table)
+            rows.append((f"   {key}:", value))
+        width = max(len(label) for label, _ in rows)
+        # Один шаблон і один print на весь блок замість побудови rich-таблиці
+        _console.print("\n".join(
+            _DETAIL_ROW_TMPL.format(label=label, width=width, value=value)
+            for label, value in rows
+        ))
 
 
 def print_tech_error(text: str, error_obj: Exception | None = None):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [red]{ICON_STOP} {text}[/red]"
-    )
-    if error_obj:
-        error_type = type(error_obj).__name__
-        error_message = str(error_obj)
-        table = Table(
-            show_header=False, box=None, padding=(0, 1), pad_edge=False,
-        )
-        table.add_column(style="red", no_wrap=True, min_width=3)
-        table.add_column(style="white")
-        table.add_row("   Тип помилки:", error_type)
-        table.add_row("   Повідомлення:", error_message)
-        _console.print(table)
-        if hasattr(error_obj, "__traceback__") and error_obj.__traceback__:
-            import traceback
-
-            tb_lines = traceback.format_tb(error_obj.__traceback__)
-            if len(tb_lines) > 3:
-                tb_lines = tb_lines[-3:]
-            _console.print("   [red]Стек викликів:[/red]")
-            for line in tb_lines:
-                _console.print(f"   [yellow]{line.strip()}[/yellow]")
+    with _console:
+        _console.print(_STOP_TMPL % (get_current_time(), text))
+        if error_obj:
+            error_type = type(error_obj).__name__
+            error_message = str(error_obj)
+            table = Table(
+                show_header=False, box=None, padding=(0, 1), pad_edge=False,
+            )
+            table.add_column(style="red", no_wrap=True, min_width=3)
+            table.add_column(style="white")
+            table.add_row("   Тип помилки:", error_type)
+            table.add_row("   Повідомлення:", error_message)
+            _console.print(table)
+            if hasattr(error_obj, "__traceback__") and error_obj.__traceback__:
+                import traceback
+
+                # Від'ємний limit — лише останні 3 кадри; решта стеку не форматується
+                tb_lines = traceback.format_tb(error_obj.__traceback__, limit=-3)
+                _console.print("   [red]Стек викликів:[/red]")
+                for line in tb_lines:
+                    _console.print(f"   [yellow]{line.strip()}[/yellow]")
 
 
 def print_info(text: str):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [green]{ICON_INFO}  {text}[/green]"
-    )
+    _console.print(_INFO_TMPL % (get_current_time(), text))
 
 
 def print_warning(text: str):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [yellow]{ICON_WARN}  {text}[/yellow]"
-    )
+    _console.print(_WARN_TMPL % (get_current_time(), text))
 
 
 def print_error(text: str):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [red]{ICON_ERR} {text}[/red]"
-    )
+    _console.print(_ERR_TMPL % (get_current_time(), text))
 
 
 def print_success(text: str):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [green]{ICON_OK} {text}[/green]"
-    )
+    _console.print(_OK_TMPL % (get_current_time(), text))
 
 
 def print_progress(text: str):
-    _console.print(
-        f"[dim]\\[{get_current_time()}][/dim] [blue]{ICON_PROGRESS} {text}[/blue]"
-    )
+    _console.print(_PROGRESS_TMPL % (get_current_time(), text))
+
+
+_KIB = 1024
+_MIB = 1024 * 1024
+_GIB = 1024 * 1024 * 1024
 
 
 def format_file_size(size_bytes: int) -> str:
     """Форматує розмір файлу у зручну форму (Б/КБ/МБ/ГБ)."""
-    if size_bytes < 1024:
+    if size_bytes < _KIB:
         return f"{size_bytes} Б"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f} КБ"
-    elif size_bytes < 1024 * 1024 * 1024:
-        return f"{size_bytes / (1024 * 1024):.2f} МБ"
-    else:
-        return f"{size_bytes / (1024 * 1024 * 1024):.2f} ГБ"
+    if size_bytes < _MIB:
+        return f"{size_bytes / _KIB:.1f} КБ"
+    if size_bytes < _GIB:
+        return f"{size_bytes / _MIB:.2f} МБ"
+    return f"{size_bytes / _GIB:.2f} ГБ"
 
 
-def format_time(seconds: float):
-    hours, remainder = divmod(seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    if hours > 0:
-        return f"{int(hours)} год {int(minutes)} хв {seconds:.2f} сек"
-    elif minutes > 0:
-        return f"{int(minutes)} хв {seconds:.2f} сек"
-    else:
-        return f"{seconds:.2f} сек"
+_TIME_FMT_H = "%d год %d хв %d.%02d сек"
+_TIME_FMT_M = "%d хв %d.%02d сек"
+_TIME_FMT_S = "%d.%02d сек"
+_TIME_FMT_H_INT = "%d год %d хв %d сек"
+_TIME_FMT_M_INT = "%d хв %d сек"
+_TIME_FMT_S_INT = "%d сек"
 
 
+def format_time(seconds: float):
+    # inf/nan (вироджена оцінка TimeTracker) — текстом, а не винятком з round()
+    if not math.isfinite(seconds):
+        return f"{seconds} сек"
+    # Цілі секунди (зворотний відлік) — без форматування дробової частини
+    if isinstance(seconds, int) or seconds.is_integer():
+        hours, remainder = divmod(int(seconds), 3600)
+        minutes, secs = divmod(remainder, 60)
+        if hours:
+            return _TIME_FMT_H_INT % (hours, minutes, secs)
+        if minutes:
+            return _TIME_FMT_M_INT % (minutes, secs)
+        return _TIME_FMT_S_INT % secs
+    # Уся арифметика в цілих сотих секунди: одне округлення на вході,
+    # тож 59.999 стає "1 хв 0.00 сек", а не "60.00 сек"
+    hours, remainder = divmod(round(seconds * 100), 360_000)
+    minutes, remainder = divmod(remainder, 6000)
+    secs, hundredths = divmod(remainder, 100)
+    if hours:
+        return _TIME_FMT_H % (hours, minutes, secs, hundredths)
+    if minutes:
+        return _TIME_FMT_M % (minutes, secs, hundredths)
+    return _TIME_FMT_S % (secs, hundredths)
+
+
+_EXCEL_EPOCH = datetime.date(1899, 12, 30)
+# .NET DateTime.Ticks — інтервали по 100 нс від 0001-01-01
+DOTNET_TICKS_PER_DAY = 864_000_000_000
+EXCEL_EPOCH_DOTNET_DAYS = _EXCEL_EPOCH.toordinal() - 1
+
 _System = None  # Кеш .NET System модуля (завантажується один раз)
 _System_loaded = False
+# Точний тип значення -> конвертер; будується при першому виклику,
+# коли вже відомо, чи доступний System (pythonnet)
+_value_converters: dict | None = None
 
 
-def convert_dotnet_to_python(value):
-    """Конвертує .NET типи (через pythonnet) у серіалізовані Python значення для запису в CSV/XLSX."""
+def _identity(value):
+    return value
+
+
+def _none(value):
+    return None
+
+
+def _dotnet_datetime_to_serial(value):
+    # Одне читання .Ticks замість Year/Month/Day — кожна властивість окремий виклик interop
+    return value.Ticks // DOTNET_TICKS_PER_DAY - EXCEL_EPOCH_DOTNET_DAYS
+
+
+def _datetime_to_serial(value):
+    return (value.date() - _EXCEL_EPOCH).days
+
+
+def _date_to_serial(value):
+    return (value - _EXCEL_EPOCH).days
+
+
+def get_dotnet_system():
+    """Модуль .NET System (pythonnet) або None, якщо він недоступний. Імпортується один раз."""
     global _System, _System_loaded
     if not _System_loaded:
         try:
@@ -172,18 +275,47 @@ def convert_dotnet_to_python(value):
         except Exception:
             _System = None
         _System_loaded = True
-
-    if value is None:
-        return None
+    return _System
+
+
+def _build_value_converters() -> dict:
+    get_dotnet_system()
+    converters = {
+        type(None): _none,
+        # pythonnet може авто-конвертувати .NET типи в Python native —
+        # вони повертаються як є, щоб не потрапляли у str() fallback
+        float: _identity,
+        int: _identity,
+        str: _identity,
+        bool: _identity,
+        datetime.datetime: _datetime_to_serial,
+        datetime.date: _date_to_serial,
+    }
+    S = _System
+    if S is not None:
+        converters.update({
+            S.DateTime: _dotnet_datetime_to_serial,
+            S.Double: float,
+            S.Single: float,
+            S.Decimal: float,
+            S.DBNull: _none,
+            S.Int32: int,
+            S.Int64: int,
+            S.UInt32: int,
+            S.UInt64: int,
+            S.String: str,
+            S.Boolean: bool,
+        })
+    return converters
+
+
+def _convert_by_isinstance(value):
+    """Повільний шлях для підкласів (numpy-скаляри тощо), яких немає в таблиці точних типів."""
     S = _System
     if S is not None:
         if isinstance(value, S.DateTime):
-            epoch = datetime.date(1899, 12, 30)
-            d = datetime.date(value.Year, value.Month, value.Day)
-            return (d - epoch).days
-        if isinstance(value, (S.Double, S.Single)):
-            return float(value)
-        if isinstance(value, S.Decimal):
+            return _dotnet_datetime_to_serial(value)
+        if isinstance(value, (S.Double, S.Single, S.Decimal)):
             return float(value)
         if isinstance(value, S.DBNull):
             return None
@@ -193,24 +325,26 @@ def convert_dotnet_to_python(value):
             return str(value)
         if isinstance(value, S.Boolean):
             return bool(value)
-    # pythonnet може авто-конвертувати .NET типи в Python native —
-    # обробляємо їх тут, щоб не потрапляли у str() fallback
-    if isinstance(value, float):
-        return value
-    if isinstance(value, int):
-        return value
-    if isinstance(value, str):
-        return value
-    if isinstance(value, bool):
+    if isinstance(value, (float, int, str)):
         return value
     if isinstance(value, datetime.datetime):
-        epoch = datetime.date(1899, 12, 30)
-        d = value.date()
-        return (d - epoch).days
+        return _datetime_to_serial(value)
     if isinstance(value, datetime.date):
-        epoch = datetime.date(1899, 12, 30)
-        return (value - epoch).days
+        return _date_to_serial(value)
     try:
         return str(value)
     except Exception:
         return None
+
+
+def convert_dotnet_to_python(value):
+    """Конвертує .NET типи (через pythonnet) у серіалізовані Python значення для запису в CSV/XLSX."""
+    global _value_converters
+    converters = _value_converters
+    if converters is None:
+        converters = _value_converters = _build_value_converters()
+    # Один dict-lookup за точним типом замість ланцюжка isinstance на кожну клітинку
+    convert = converters.get(type(value))
+    if convert is not None:
+        return convert(value)
+    return _convert_by_isinstance(value)
@@ -1,9 +1,8 @@
 import csv
-import math
+import os
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
-import numpy as np
 import pandas as pd
 import xlsxwriter  # type: ignore
 
@@ -13,12 +12,16 @@ _NEG_INF = float('-inf')
 if TYPE_CHECKING:
     from ..core.config import ExcelHeaderConfig, XlsxConfig
 
+# Значення csv.QUOTE_MINIMAL / QUOTE_ALL / QUOTE_NONNUMERIC / QUOTE_NONE
+_CsvQuoting = Literal[0, 1, 2, 3]
+
 
 class CsvStreamWriter:
     def __init__(self, file_path: Path, delimiter: str, encoding: str, quoting_mode: str):
         self.file_path = file_path
         self.delimiter = delimiter
         self.encoding = encoding
+        self.quoting: _CsvQuoting
         if quoting_mode == "all":
             self.quoting = csv.QUOTE_ALL
         elif quoting_mode == "nonnumeric":
@@ -27,25 +30,36 @@ class CsvStreamWriter:
             self.quoting = csv.QUOTE_MINIMAL
         self.is_first = True
         self.row_count = 0
+        # Файл відкривається один раз на перший chunk і тримається до close()
+        self._file = None
+        self._writer = None
 
     def write_chunk(self, df: pd.DataFrame):
-        # inf → NaN (to_csv з na_rep="" запише як порожній рядок)
-        df_clean = df.replace([np.inf, -np.inf], np.nan)
-        df_clean.to_csv(
-            str(self.file_path),
-            mode='w' if self.is_first else 'a',
-            sep=self.delimiter,
-            encoding=self.encoding,
-            index=False,
-            header=self.is_first,
-            quoting=self.quoting,  # type: ignore[arg-type]
-            na_rep=""
+        writer = self._writer
+        if writer is None:
+            self._file = open(self.file_path, "w", encoding=self.encoding, newline="")
+            # os.linesep — як у попередньому df.to_csv(), щоб формат файлу не змінився
+            writer = self._writer = csv.writer(
+                self._file, delimiter=self.delimiter, quoting=self.quoting, lineterminator=os.linesep
+            )
+        if self.is_first:
+            writer.writerow(df.columns)
+            self.is_first = False
+        # NaN/Inf → None (порожня клітинка) на льоту, без копії всього DataFrame
+        writer.writerows(
+            tuple(
+                None if isinstance(v, float) and (v != v or v == _POS_INF or v == _NEG_INF) else v
+                for v in row
+            )
+            for row in df.itertuples(index=False, name=None)
         )
-        self.is_first = False
         self.row_count += len(df)
 
     def close(self):
-        pass
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
 
 
 class XlsxStreamWriter:
@@ -1,8 +1,10 @@
 import datetime
 import re
+from collections import Counter
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AbstractSet
 
+import numpy as np
 import pandas as pd
 
 from ..core.utils import (
@@ -14,15 +16,132 @@ from ..core.utils import (
     format_time,
     format_file_size,
     convert_dotnet_to_python,
+    get_dotnet_system,
+    DOTNET_TICKS_PER_DAY,
+    EXCEL_EPOCH_DOTNET_DAYS,
     ensure_dir,
 )
 # CsvStreamWriter / XlsxStreamWriter are imported lazily inside run_dax_query
 from ..core import progress
+from ..core.periods import iso_weeks_in_year
 
 if TYPE_CHECKING:
     from ..core.config import QueryConfig, ExportConfig, XlsxConfig, CsvConfig, ExcelHeaderConfig, PathsConfig, ClickHouseConfig
 
 
+# Table[column] у назвах стовпців результату DAX
+_DAX_COLUMN_RE = re.compile(r"(\w+)\[([^\]]+)\]")
+
+# Групувальні стовпці експорту: однаковий перелік у SUMMARIZECOLUMNS і ORDER BY
+_DAX_GROUP_COLUMNS = (
+    "'Calendar'[calendar_date]",
+    "Goods[fg1_name]",
+    "Goods[fg2_name]",
+    "Goods[fg3_name]",
+    "Goods[fg4_name]",
+    "Goods[articul]",
+    "Goods[articul_name]",
+    "Goods[producer_name]",
+    "Agents_hybrid[name]",
+    "Markets[doc_prefix_original]",
+    "Channel_type[sell_channel_type_name]",
+    "Price_types[name]",
+    "Price_types[is_tender]",
+    "Doc_types[name]",
+    "Credit_products[payment_code]",
+    "Credit_products[payment_typ]",
+    "Credit_products[product_types]",
+    "Credit_products[bank_name]",
+    "Credit_products[bank_credit_product_code]",
+    "Credit_products[product_name]",
+    "Credit_products[payment_count]",
+    "Promo[promo_type_name]",
+    "Promo[basis]",
+)
+
+# (назва у результаті, міра куба)
+_DAX_MEASURES = (
+    ("Реалізація, к-сть", "[sell_qty]"),
+    ("Реалізація, грн.", "[sell_amount_nds]"),
+    ("Реалізація ЦЗ, грн.", "[buy_amount_nds]"),
+    ("Дохід, грн.", "[profit_amount_nds]"),
+    ("Отримані бонуси", "[bonus_obtained_amount]"),
+    ("Використані бонуси", "[bonus_used_amount]"),
+    ("Комісія по кредитам", "[credit_commission_amount]"),
+)
+
+# Шаблон запиту збирається один раз при імпорті; на кожен тиждень
+# підставляються лише year_num, week_num і фільтр fg1 (фігурні дужки DAX
+# екрановані для str.format)
+_DAX_EXPORT_QUERY = (
+    """
+    /* START QUERY BUILDER */
+    EVALUATE
+    SUMMARIZECOLUMNS(
+"""
+    + "".join(f"        {col},\n" for col in _DAX_GROUP_COLUMNS)
+    + """        KEEPFILTERS( TREATAS( {{{year_num}}}, 'Calendar'[year_num] )),
+        KEEPFILTERS( TREATAS( {{{week_num}}}, 'Calendar'[week_num] )),{fg1_filter}
+"""
+    + ",\n".join(f'        "{name}", {measure}' for name, measure in _DAX_MEASURES)
+    + """
+    )
+    ORDER BY
+"""
+    + ",\n".join(f"        {col} ASC" for col in _DAX_GROUP_COLUMNS)
+    + """
+    /* END QUERY BUILDER */
+    """
+)
+
+_DAX_FG1_FILTER = """
+        KEEPFILTERS( TREATAS( {{"{escaped_filter_fg1}"}}, Goods[fg1_name] )),"""
+
+# Нульовий день серійних дат Excel (1900 date system)
+_EXCEL_EPOCH = pd.Timestamp(1899, 12, 30)
+
+
+def _convert_object_column(values: pd.Series):
+    """
+    Конвертує object-колонку з .NET значень одним векторним кроком, якщо всі
+    значення одного типу System.DateTime або System.Decimal/Double/Single.
+
+    DateTime читається через .Ticks (один виклик interop на клітинку) і
+    переводиться в серійну дату Excel цілочисельною арифметикою над масивом.
+    Змішані колонки або колонки з NULL ідуть через поелементний
+    convert_dotnet_to_python.
+    """
+    S = get_dotnet_system()
+    if S is not None and len(values):
+        value_types = set(map(type, values))
+        if len(value_types) == 1:
+            value_type = value_types.pop()
+            if value_type is S.DateTime:
+                ticks = np.fromiter((v.Ticks for v in values), dtype=np.int64, count=len(values))
+                return ticks // DOTNET_TICKS_PER_DAY - EXCEL_EPOCH_DOTNET_DAYS
+            if value_type in (S.Decimal, S.Double, S.Single):
+                return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    return values.map(convert_dotnet_to_python)
+
+
+def _build_chunk_frame(rows: list, columns: list) -> pd.DataFrame:
+    """
+    Будує DataFrame з сирих рядків курсора і конвертує .NET значення по колонках.
+
+    Колонки, які pandas уже розпізнав як числові/bool (pythonnet авто-конвертує
+    примітиви), не чіпаються; datetime64 переводиться в серійну дату Excel
+    векторно; поелементний convert_dotnet_to_python лишається тільки для object.
+    """
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col, values in df.items():
+        dtype = values.dtype
+        if dtype == object:
+            df[col] = _convert_object_column(values)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            df[col] = (values.dt.normalize() - _EXCEL_EPOCH).dt.days
+    return df
+
+
 def generate_year_week_pairs(start_period, end_period, available_weeks):
     try:
         start_year, start_week = map(int, start_period.split("-"))
@@ -41,22 +160,23 @@ def generate_year_week_pairs(start_period, end_period, available_weeks):
         print_warning("Початковий період має бути раніше за кінцевий")
         return []
 
-    available_dict = {(year, week): True for year, week in available_weeks}
-    filtered_pairs = []
+    # Готовий set/frozenset (period_resolver) використовується як є
+    if isinstance(available_weeks, AbstractSet):
+        available_set = available_weeks
+    else:
+        available_set = frozenset(available_weeks)
     all_pairs = []
     cy, cw = start_year, start_week
+    weeks_in_year = iso_weeks_in_year(cy)
     while cy < end_year or (cy == end_year and cw <= end_week):
         all_pairs.append((cy, cw))
-        cw += 1
-        # Перевірка існування тижня через fromisocalendar
-        try:
-            datetime.date.fromisocalendar(cy, cw, 1)
-        except ValueError:
+        if cw >= weeks_in_year:
             cw = 1
             cy += 1
-    for year, week in all_pairs:
-        if (year, week) in available_dict:
-            filtered_pairs.append((year, week))
+            weeks_in_year = iso_weeks_in_year(cy)
+        else:
+            cw += 1
+    filtered_pairs = [pair for pair in all_pairs if pair in available_set]
     if len(filtered_pairs) == 0:
         print_warning("Не знайдено доступних тижнів у вказаному діапазоні")
     else:
@@ -64,6 +184,138 @@ def generate_year_week_pairs(start_period, end_period, available_weeks):
     return filtered_pairs
 
 
+# Розмір chunk'а потокового експорту (рядків)
+_CHUNK_SIZE = 50000
+
+
+def _rename_dax_columns(raw_columns: list) -> tuple:
+    """
+    Скорочує назви стовпців DAX: Table[column] → column.
+
+    Якщо коротка назва зустрічається більше одного разу, стовпець лишається
+    з повною назвою. Повертає (нові назви, [(сира назва, конфліктна назва), ...]).
+    """
+    # Один прохід regex: (сира назва, коротка назва, match)
+    parsed = []
+    for col in raw_columns:
+        m = _DAX_COLUMN_RE.match(col)
+        parsed.append((col, m.group(2) if m else col.strip("[]"), m))
+    name_counts = Counter(name for _, name, _ in parsed)
+
+    renamed_columns = []
+    duplicate_columns = []
+    for col, column_name, m in parsed:
+        if m and name_counts[column_name] > 1:
+            renamed_columns.append(col)
+            duplicate_columns.append((col, column_name))
+        else:
+            renamed_columns.append(column_name)
+    return renamed_columns, duplicate_columns
+
+
+# Формати, за яких дані йдуть лише у sinks, без локальних файлів
+_SINK_ONLY_FORMATS = frozenset({"CH", "CLICKHOUSE", "DUCK", "DUCKDB", "PG", "POSTGRESQL"})
+_XLSX_FORMATS = frozenset({"XLSX", "BOTH"})
+_CSV_FORMATS = frozenset({"CSV", "BOTH"})
+
+
+def _resolve_export_targets(export_config: "ExportConfig") -> tuple:
+    """
+    Визначає цілі експорту один раз на запит.
+
+    Повертає (needs_xlsx, needs_csv, sink_only); force_csv_only вимикає XLSX
+    і вмикає CSV для будь-якого файлового формату.
+    """
+    export_format = export_config.format.upper()
+    if export_format in _SINK_ONLY_FORMATS:
+        return False, False, True
+    force_csv_only = export_config.force_csv_only
+    needs_xlsx = export_format in _XLSX_FORMATS and not force_csv_only
+    needs_csv = export_format in _CSV_FORMATS or force_csv_only
+    return needs_xlsx, needs_csv, False
+
+
+def _open_file_writers(
+    year_dir: Path,
+    year_num: int,
+    week_num: int,
+    needs_xlsx: bool,
+    needs_csv: bool,
+    xlsx_config: "XlsxConfig",
+    csv_config: "CsvConfig",
+    excel_header: "ExcelHeaderConfig",
+):
+    """Створює потокові writer'и для потрібних форматів. Повертає (xlsx_writer, csv_writer)."""
+    from .exporter import CsvStreamWriter, XlsxStreamWriter
+
+    period_name = f"{year_num}-{week_num:02d}"
+    xlsx_writer = None
+    csv_writer = None
+    if needs_xlsx:
+        xlsx_writer = XlsxStreamWriter(year_dir / f"{period_name}.xlsx", period_name, excel_header, xlsx_config)
+    if needs_csv:
+        csv_writer = CsvStreamWriter(
+            year_dir / f"{period_name}.csv", csv_config.delimiter, csv_config.encoding, csv_config.quoting
+        )
+    return xlsx_writer, csv_writer
+
+
+def _close_file_writers(xlsx_writer, csv_writer, total_rows: int) -> list:
+    """Закриває writer'и і звітує про створені файли. Повертає [(шлях, розмір у байтах), ...] (XLSX першим)."""
+    exported_files = []
+    if xlsx_writer:
+        _, file_size_bytes = xlsx_writer.close()
+        exported_files.append((xlsx_writer.file_path_str, file_size_bytes))
+    if csv_writer:
+        csv_writer.close()
+        exported_files.append((str(csv_writer.file_path), csv_writer.file_path.stat().st_size))
+
+    for filepath, file_size_bytes in exported_files:
+        file_size = format_file_size(file_size_bytes)
+        print_success(
+            f"Дані експортовано у файл: {filepath} ({file_size}, {total_rows} рядків)"
+        )
+    return exported_files
+
+
+def _iter_chunk_frames(cursor, columns: list, chunk_size: int = _CHUNK_SIZE):
+    """Читає рядки курсора і віддає їх DataFrame-chunk'ами по chunk_size рядків."""
+    # Використовуємо пряму ітерацію fetchone()-генератора:
+    # fetchmany() має баг у pyadomd — кожен виклик next(self.fetchone()) створює
+    # новий генератор, що руйнує стан XmlReader після ~50000 рядків.
+    raw_chunk: list = []
+    for row in cursor.fetchone():
+        raw_chunk.append(row)
+        if len(raw_chunk) >= chunk_size:
+            yield _build_chunk_frame(raw_chunk, columns)
+            raw_chunk = []
+    # Останній неповний chunk
+    if raw_chunk:
+        yield _build_chunk_frame(raw_chunk, columns)
+
+
+def _flush_to_sinks(
+    sinks: list, failed_sinks: set, df_chunk: pd.DataFrame, year_num: int, week_num: int, is_first: bool
+) -> None:
+    """Відправляє chunk у sinks; на першому chunk'у готує таблицю і видаляє старі дані періоду."""
+    from ..sinks import sanitize_df as _sanitize
+    df_for_sinks = _sanitize(df_chunk)
+    df_for_sinks["year_num"] = year_num
+    df_for_sinks["week_num"] = week_num
+    for sink in sinks:
+        sink_name = type(sink).__name__
+        if sink_name in failed_sinks:
+            continue  # Пропускаємо sink що вже впав
+        try:
+            if is_first:
+                sink.setup(df_for_sinks)
+                sink.delete_period(year_num, week_num)
+            sink.insert(df_for_sinks, year=year_num, week=week_num)
+        except Exception as e:
+            print_error(f"Помилка sink {sink_name}: {e}")
+            failed_sinks.add(sink_name)
+
+
 def run_dax_query(
     connection,
     reporting_period: str,
@@ -74,6 +326,8 @@ def run_dax_query(
     excel_header: "ExcelHeaderConfig",
     paths_config: "PathsConfig",
     sinks: "list | None" = None,
+    show_spinner: bool = True,
+    year_dir: Path | None = None,
 ):
     try:
         year_num, week_num = map(int, reporting_period.split("-"))
@@ -87,76 +341,15 @@ def run_dax_query(
     has_filter = bool(filter_fg1_name)
     escaped_filter_fg1 = (filter_fg1_name or "").replace('"', '""') if has_filter else ""
 
-    result_dir = Path(paths_config.result_dir)
-    year_dir = result_dir / str(year_num)
-    ensure_dir(year_dir)
+    # year_dir передає runner — директорію року вже створено перед циклом
+    if year_dir is None:
+        year_dir = Path(paths_config.result_dir) / str(year_num)
+        ensure_dir(year_dir)
 
-    from .exporter import CsvStreamWriter, XlsxStreamWriter
+    needs_xlsx, needs_csv, sink_only = _resolve_export_targets(export_config)
 
-    query = f"""
-    /* START QUERY BUILDER */
-    EVALUATE
-    SUMMARIZECOLUMNS(
-        'Calendar'[calendar_date],
-        Goods[fg1_name],
-        Goods[fg2_name],
-        Goods[fg3_name],
-        Goods[fg4_name],
-        Goods[articul],
-        Goods[articul_name],
-        Goods[producer_name],
-        Agents_hybrid[name],
-        Markets[doc_prefix_original],
-        Channel_type[sell_channel_type_name],
-        Price_types[name],
-        Price_types[is_tender],
-        Doc_types[name],
-        Credit_products[payment_code],
-        Credit_products[payment_typ],
-        Credit_products[product_types],
-        Credit_products[bank_name],
-        Credit_products[bank_credit_product_code],
-        Credit_products[product_name],
-        Credit_products[payment_count],
-        Promo[promo_type_name],
-        Promo[basis],
-        KEEPFILTERS( TREATAS( {{{year_num}}}, 'Calendar'[year_num] )),
-        KEEPFILTERS( TREATAS( {{{week_num}}}, 'Calendar'[week_num] )),{f'''
-        KEEPFILTERS( TREATAS( {{"{escaped_filter_fg1}"}}, Goods[fg1_name] )),''' if has_filter else ''}
-        "Реалізація, к-сть", [sell_qty],
-        "Реалізація, грн.", [sell_amount_nds],
-        "Реалізація ЦЗ, грн.", [buy_amount_nds],
-        "Дохід, грн.", [profit_amount_nds],
-        "Отримані бонуси", [bonus_obtained_amount],
-        "Використані бонуси", [bonus_used_amount],
-        "Комісія по кредитам", [credit_commission_amount]
-    )
-    ORDER BY
-        'Calendar'[calendar_date] ASC,
-        Goods[fg1_name] ASC,
-        Goods[fg2_name] ASC,
-        Goods[fg3_name] ASC,
-        Goods[fg4_name] ASC,
-        Goods[articul] ASC,
-        Goods[articul_name] ASC,
-        Goods[producer_name] ASC,
-        Agents_hybrid[name] ASC,
-        Markets[doc_prefix_original] ASC,
-        Channel_type[sell_channel_type_name] ASC,
-        Price_types[name] ASC,
-        Price_types[is_tender] ASC,
-        Doc_types[name] ASC,
-        Credit_products[payment_code] ASC,
-        Credit_products[payment_typ] ASC,
-        Credit_products[product_types] ASC,
-        Credit_products[bank_name] ASC,
-        Credit_products[bank_credit_product_code] ASC,
-        Credit_products[product_name] ASC,
-        Credit_products[payment_count] ASC,
-        Promo[promo_type_name] ASC,
-        Promo[basis] ASC
-    /* END QUERY BUILDER */
-    """
+    fg1_filter = _DAX_FG1_FILTER.format(escaped_filter_fg1=escaped_filter_fg1) if has_filter else ""
+    query = _DAX_EXPORT_QUERY.format(year_num=year_num, week_num=week_num, fg1_filter=fg1_filter)
 
     import threading
     import time as _time
@@ -165,145 +358,57 @@ def run_dax_query(
     query_start_time = _time.time()
     cursor = None
     spinner_thread = None
+    csv_writer = None
     try:
         cursor = connection.cursor()
         cursor.execute(query)
-        spinner_thread = threading.Thread(
-            target=progress.loading_spinner,
-            args=("Отримання даних з OLAP кубу",),
+        # Спінер один на процес (спільний animation_stop_event) — паралельні
+        # виклики запускаються з show_spinner=False
+        if show_spinner:
+            progress.animation_stop_event.clear()
+            spinner_thread = threading.Thread(
+                target=progress.loading_spinner,
+                args=("Отримання даних з OLAP кубу",),
+                daemon=True,
+            )
+            spinner_thread.start()
+
+        xlsx_writer, csv_writer = _open_file_writers(
+            year_dir, year_num, week_num, needs_xlsx, needs_csv, xlsx_config, csv_config, excel_header
+        )
+
+        renamed_columns, duplicate_columns = _rename_dax_columns(
+            [desc[0] for desc in cursor.description]
         )
-        spinner_thread.start()
-
-        export_format = export_config.format.upper()
-        force_csv_only = export_config.force_csv_only
-        sink_only = export_format in ("CH", "CLICKHOUSE", "DUCK", "DUCKDB", "PG", "POSTGRESQL")
-
-        needs_xlsx = (export_format in ["XLSX", "BOTH"]) and not force_csv_only and not sink_only
-        needs_csv = (export_format in ["CSV", "BOTH"] or force_csv_only) and not sink_only
-
-        xlsx_writer = None
-        csv_writer = None
-        exported_files = []
-
-        if needs_xlsx:
-            xlsx_path = year_dir / f"{year_num}-{week_num:02d}.xlsx"
-            xlsx_writer = XlsxStreamWriter(xlsx_path, f"{year_num}-{week_num:02d}", excel_header, xlsx_config)
-            exported_files.append(str(xlsx_path))
-
-        if needs_csv:
-            csv_path = year_dir / f"{year_num}-{week_num:02d}.csv"
-            csv_writer = CsvStreamWriter(csv_path, csv_config.delimiter, csv_config.encoding, csv_config.quoting)
-            exported_files.append(str(csv_path))
-
-        raw_columns = [desc[0] for desc in cursor.description]
-
-        pattern = re.compile(r"(\w+)\[([^\]]+)\]")
-        potential_names = {}
-        for col in raw_columns:
-            m = pattern.match(col)
-            column_name = m.group(2) if m else col.strip("[]")
-            potential_names[column_name] = False if column_name in potential_names else True
-
-        renamed_columns = []
-        duplicate_columns = []
-        for col in raw_columns:
-            m = pattern.match(col)
-            if m:
-                column_name = m.group(2)
-                if potential_names.get(column_name, True):
-                    renamed_columns.append(column_name)
-                else:
-                    renamed_columns.append(col)
-                    duplicate_columns.append(col)
-            else:
-                renamed_columns.append(col.strip("[]"))
 
         # Зупиняємо спінер ПЕРЕД будь-яким виводом
-        progress.animation_stop_event.set()
-        spinner_thread.join(timeout=1.0)
+        if spinner_thread is not None:
+            progress.animation_stop_event.set()
+            spinner_thread.join(timeout=1.0)
 
         query_duration = _time.time() - query_start_time
         print_success(f"Запит виконано за {format_time(query_duration)}.")
 
         if duplicate_columns and not getattr(run_dax_query, "_dup_warned", False):
             print_warning("Деякі стовпці не були перейменовані через потенційне дублювання:")
-            for col in duplicate_columns:
-                match = re.match(r"(\w+)\[([^\]]+)\]", col)
-                if match:
-                    print_warning(f"  • {col} (конфлікт імені: {match.group(2)})")
+            for col, column_name in duplicate_columns:
+                print_warning(f"  • {col} (конфлікт імені: {column_name})")
             run_dax_query._dup_warned = True  # type: ignore[attr-defined]
 
-        chunk_size = 50000
         total_rows = 0
-        is_first_chunk = True
-
         failed_sinks: set[str] = set()
 
-        def _flush_to_sinks(df_chunk: pd.DataFrame, is_first: bool) -> bool:
-            """Відправляє chunk у sinks. Повертає False якщо це був перший chunk."""
-            if not sinks:
-                return is_first
-            from ..sinks import sanitize_df as _sanitize
-            df_for_sinks = _sanitize(df_chunk)
-            df_for_sinks["year_num"] = year_num
-            df_for_sinks["week_num"] = week_num
-            for sink in sinks:
-                sink_name = type(sink).__name__
-                if sink_name in failed_sinks:
-                    continue  # Пропускаємо sink що вже впав
-                try:
-                    if is_first:
-                        sink.setup(df_for_sinks)
-                        sink.delete_period(year_num, week_num)
-                    sink.insert(df_for_sinks, year=year_num, week=week_num)
-                except Exception as e:
-                    print_error(f"Помилка sink {sink_name}: {e}")
-                    failed_sinks.add(sink_name)
-            return False
-
         print_progress("Експорт/збереження отриманих даних (потоковий режим)...")
-        # Використовуємо пряму ітерацію fetchone()-генератора:
-        # fetchmany() має баг у pyadomd — кожен виклик next(self.fetchone()) створює
-        # новий генератор, що руйнує стан XmlReader після ~50000 рядків.
-        raw_chunk: list = []
-        for row in cursor.fetchone():
-            raw_chunk.append([convert_dotnet_to_python(v) for v in row])
-            if len(raw_chunk) < chunk_size:
-                continue
-
-            df_chunk = pd.DataFrame(raw_chunk, columns=renamed_columns)
-            raw_chunk = []
-
+        for df_chunk in _iter_chunk_frames(cursor, renamed_columns):
             if xlsx_writer:
                 xlsx_writer.write_chunk(df_chunk)
             if csv_writer:
                 csv_writer.write_chunk(df_chunk)
-
-            is_first_chunk = _flush_to_sinks(df_chunk, is_first_chunk)
+            if sinks:
+                _flush_to_sinks(sinks, failed_sinks, df_chunk, year_num, week_num, total_rows == 0)
             total_rows += len(df_chunk)
 
-        # Останній неповний chunk
-        if raw_chunk:
-            df_chunk = pd.DataFrame(raw_chunk, columns=renamed_columns)
-            if xlsx_writer:
-                xlsx_writer.write_chunk(df_chunk)
-            if csv_writer:
-                csv_writer.write_chunk(df_chunk)
-            is_first_chunk = _flush_to_sinks(df_chunk, is_first_chunk)
-            total_rows += len(df_chunk)
-
-        for filepath in exported_files:
-            file_size_bytes = 0
-            if xlsx_writer and filepath == xlsx_writer.file_path_str:
-                _, file_size_bytes = xlsx_writer.close()
-            elif csv_writer and filepath == str(csv_writer.file_path):
-                csv_writer.close()
-                file_size_bytes = Path(filepath).stat().st_size
-
-            file_size = format_file_size(file_size_bytes)
-            print_success(
-                f"Дані експортовано у файл: {filepath} ({file_size}, {total_rows} рядків)"
-            )
+        exported_files = _close_file_writers(xlsx_writer, csv_writer, total_rows)
 
         if total_rows == 0:
             print_warning(f"Запит не повернув даних для періоду {reporting_period}")
@@ -317,11 +422,15 @@ def run_dax_query(
                     print_success(f"Дані завантажено у {sink_names}: {total_rows} рядків ({reporting_period})")
             return None
             
+        # (шлях, розмір): розмір знято при закритті — викликачу не потрібен stat()
         return exported_files[0] if exported_files else None
     except Exception as e:
         print_error(f"Помилка при виконанні запиту: {e}")
         return None
     finally:
+        # CSV тримає відкритий файл між chunk'ами — закриваємо і при помилці
+        if csv_writer is not None:
+            csv_writer.close()
         # Закриваємо курсор, щоб звільнити XmlReader на з'єднанні
         if cursor is not None:
             try:
@@ -360,15 +469,22 @@ def get_available_weeks(connection):
         cursor.execute(query)
         rows = cursor.fetchall()
         cursor.close()
-        available_weeks = []
-        for row in rows:
-            year_value = convert_dotnet_to_python(row[0])
-            week_value = convert_dotnet_to_python(row[1])
-            if year_value is not None and week_value is not None:
+        values = [(convert_dotnet_to_python(row[0]), convert_dotnet_to_python(row[1])) for row in rows]
+        try:
+            # Швидкий шлях: куб зазвичай повертає лише коректні числа
+            available_weeks = [
+                (int(year_value), int(week_value))
+                for year_value, week_value in values
+                if year_value is not None and week_value is not None
+            ]
+        except (ValueError, TypeError):
+            # Повільний шлях: рядок за рядком, некоректні пропускаємо
+            available_weeks = []
+            for year_value, week_value in values:
+                if year_value is None or week_value is None:
+                    continue
                 try:
-                    year = int(year_value)
-                    week = int(week_value)
-                    available_weeks.append((year, week))
+                    available_weeks.append((int(year_value), int(week_value)))
                 except (ValueError, TypeError):
                     continue
         print_info(f"Отримано {len(available_weeks)} доступних тижнів з куба")
@@ -101,7 +101,7 @@ FORMAT_CHOICES = [
     Choice(value="pg",         name="PostgreSQL"),
 ]
 
-_FORMAT_VALUES = [c.value for c in FORMAT_CHOICES if isinstance(c, Choice)]
+_FORMAT_VALUES = frozenset(c.value for c in FORMAT_CHOICES if isinstance(c, Choice))
 
 PERIOD_CHOICES = [
     Choice(value="last-weeks",       name="Останні N тижнів"),
@@ -113,13 +113,15 @@ PERIOD_CHOICES = [
     Choice(value="manual",           name="Ручний діапазон YYYY-WW:YYYY-WW"),
 ]
 
-_PERIOD_VALUES = [c.value for c in PERIOD_CHOICES if isinstance(c, Choice)]
+_PERIOD_VALUES = frozenset(c.value for c in PERIOD_CHOICES if isinstance(c, Choice))
 
 COMPRESS_CHOICES = [
     Choice(value="none", name="Без стиснення"),
     Choice(value="zip",  name="ZIP архів"),
 ]
 
+_COMPRESS_VALUES = frozenset(c.value for c in COMPRESS_CHOICES)
+
 _PERIOD_LABELS = {
     "last-weeks":      "last-weeks",
     "current-month":   "поточний місяць",
@@ -130,6 +132,17 @@ _PERIOD_LABELS = {
     "manual":          "ручний діапазон",
 }
 
+# period_type -> (CLI прапорець, чи потребує значення, значення за замовчуванням)
+_PERIOD_ARGS = {
+    "last-weeks":      ("--last-weeks", True, "4"),
+    "current-month":   ("--current-month", False, None),
+    "last-month":      ("--last-month", False, None),
+    "current-quarter": ("--current-quarter", False, None),
+    "last-quarter":    ("--last-quarter", False, None),
+    "year-to-date":    ("--year-to-date", False, None),
+    "manual":          ("--period", True, None),
+}
+
 
 # ─── Wizard ──────────────────────────────────────────────────────────────────
 
@@ -186,7 +199,7 @@ def run_wizard() -> None:
             ).execute()
 
     # 4. Стиснення
-    if "compress" in p and p["compress"] in ("none", "zip"):
+    if "compress" in p and p["compress"] in _COMPRESS_VALUES:
         compress = p["compress"]
     else:
         compress = inquirer.select(
@@ -223,20 +236,13 @@ def run_wizard() -> None:
         argv += ["--profile", profile]
     argv += ["--format", fmt]
 
-    if period_type == "last-weeks":
-        argv += ["--last-weeks", period_value or "4"]
-    elif period_type == "current-month":
-        argv.append("--current-month")
-    elif period_type == "last-month":
-        argv.append("--last-month")
-    elif period_type == "current-quarter":
-        argv.append("--current-quarter")
-    elif period_type == "last-quarter":
-        argv.append("--last-quarter")
-    elif period_type == "year-to-date":
-        argv.append("--year-to-date")
-    elif period_type == "manual" and period_value:
-        argv += ["--period", period_value]
+    period_arg = _PERIOD_ARGS.get(period_type)
+    if period_arg is not None:
+        flag, takes_value, default_value = period_arg
+        if not takes_value:
+            argv.append(flag)
+        elif period_value or default_value:
+            argv += [flag, period_value or default_value]
 
     if compress != "none":
         argv += ["--compress", compress]
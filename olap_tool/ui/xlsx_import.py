@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import importlib.util
-import sys
 from pathlib import Path
 
 from InquirerPy import inquirer
@@ -157,12 +156,11 @@ def run_wizard() -> None:
         console.print(f"[red]✗ Не вдалося завантажити: {script_path}[/red]")
         return
 
-    old_argv = sys.argv
-    sys.argv = script_args
     try:
         mod = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(mod)  # type: ignore[union-attr]
-        mod.main()
+        # Аргументи передаються напряму — без підміни глобального sys.argv
+        mod.main(script_args[1:])
         console.print("\n[bold green]✓ Імпорт завершено[/bold green]")
     except SystemExit as e:
         if e.code not in (0, None):
@@ -171,7 +169,5 @@ def run_wizard() -> None:
             console.print("\n[bold green]✓ Імпорт завершено[/bold green]")
     except Exception as exc:
         console.print(f"\n[bold red]✗ Помилка: {exc}[/bold red]")
-    finally:
-        sys.argv = old_argv
 
     console.input("\n[dim]Натисніть Enter щоб повернутися в меню...[/dim]")
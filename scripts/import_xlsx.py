@@ -188,7 +188,7 @@ def _process_file(
 # Main
 # ---------------------------------------------------------------------------
 
-def main() -> int:
+def main(argv: "list[str] | None" = None) -> int:
     parser = argparse.ArgumentParser(
         description="Паралельний імпорт Excel файлів OLAP-експорту в аналітичне сховище",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -211,7 +211,7 @@ def main() -> int:
     parser.add_argument("--sheet",   default="0",            help="Аркуш Excel (назва або індекс)")
     parser.add_argument("--workers", type=int, default=4,    help="Паралельних воркерів")
     parser.add_argument("--dry-run", action="store_true",    help="Показати файли без завантаження")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Нормалізуємо target
     target = args.target.lower()